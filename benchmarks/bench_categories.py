@@ -0,0 +1,89 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Benchmark:  aggregation of distinct categorical values (instance
+        types, zones, products) from pages of spot price dicts, as
+        spotcli does for each page it writes.
+
+        set_update        set.update of instance types per page (spotcli before CategoryTable)
+        per_record        CategoryTable.encode of every field of every record
+        table_all         CategoryTable.update, all categorical fields
+        table_cli         CategoryTable(fields=('InstanceType',)).update, as spotcli
+
+    Use:
+        $ python benchmarks/bench_categories.py --records 500000 --page-size 1000
+
+"""
+import os
+import sys
+import time
+import argparse
+
+
+# benchmark the working tree, not an installed spotlib
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [here, os.path.dirname(here)]
+
+from synthetic import page, page_count                          # noqa: E402
+from spotlib.core.columnar import CategoryTable                 # noqa: E402
+
+
+def set_update(pages):
+    instance_types = set()
+    for records in pages:
+        instance_types.update(x['InstanceType'] for x in records)
+
+
+def per_record(pages):
+    table = CategoryTable()
+    for records in pages:
+        for record in records:
+            for field in table.fields:
+                table.encode(field, record[field])
+
+
+def table_all(pages):
+    table = CategoryTable()
+    for records in pages:
+        table.update(records)
+
+
+def table_cli(pages):
+    table = CategoryTable(fields=('InstanceType',))
+    for records in pages:
+        table.update(records)
+
+
+cases = [set_update, per_record, table_all, table_cli]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('Use:')[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=500000, help='records in total')
+    parser.add_argument('--page-size', type=int, default=1000, help='records per page')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case; the best is reported')
+    args = parser.parse_args()
+
+    pages = [
+        page('us-east-1', args.records, args.page_size, number)['SpotPriceHistory']
+        for number in range(page_count(args.records, args.page_size))
+    ]
+
+    print('{:<14} {:>9} {:>14}'.format('case', 'seconds', 'records/s'))
+    for case in cases:
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            case(pages)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print('{:<14} {:>9.4f} {:>14,}'.format(case.__name__, best, round(args.records / best)))
+
+
+if __name__ == '__main__':
+    main()
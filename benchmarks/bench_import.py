@@ -0,0 +1,79 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Benchmark:  import time of spotlib and startup time of spotcli.
+        Each statement is run in a fresh interpreter; the median wall
+        clock time of all repetitions is reported, together with
+        whether boto3 was loaded.
+
+    Use:
+        $ python benchmarks/bench_import.py [--repeat 20]
+
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+
+# benchmark the working tree, not an installed spotlib
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+statements = {
+    'python (baseline)': 'pass',
+    'import spotlib': 'import spotlib',
+    'import spotlib.cli': 'import spotlib.cli',
+    'spotcli --version': (
+        'import sys; sys.argv = ["spotcli", "--version"]\n'
+        'from spotlib.cli import init\n'
+        'try:\n    init()\nexcept SystemExit:\n    pass'
+    ),
+    'spotlib.SpotPrices': 'import spotlib; spotlib.SpotPrices'
+}
+
+
+def run(statement):
+    """
+    Executes a statement in a new interpreter
+
+    Returns:
+        elapsed seconds, boto3 loaded, TYPE: tuple
+    """
+    probe = statement + '\nimport sys; print("\\n" + str("boto3" in sys.modules))'
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', probe], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=root, check=True
+    ).stdout.decode('utf-8')
+    return time.perf_counter() - start, output.strip().endswith('True')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('Use:')[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print results as json')
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in statements.items():
+        timings, boto3 = [], False
+        for _ in range(args.repeat):
+            elapsed, boto3 = run(statement)
+            timings.append(elapsed)
+        results[name] = {'median_ms': round(statistics.median(timings) * 1000, 1), 'boto3': boto3}
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+    for name, result in results.items():
+        print('{:<22} {:>8.1f} ms   boto3 loaded: {}'.format(name, result['median_ms'], result['boto3']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Benchmark:  throughput (records/s) and peak resident memory of the
+        fetch, convert and write paths, served synthetic spot price
+        pages offline (see synthetic.py).  Each case runs in a fresh
+        interpreter so that peak RSS is attributable to the case.
+
+        source            page generation of the synthetic stub only
+        fetch             _spotprice_generator, datetime Timestamps
+        fetch_dtstrings   _spotprice_generator, utc string Timestamps
+        generate          generate_pricedata
+        generate_compact  generate_pricedata(compact=True)
+        utc_conversion    UtcConversion of records in memory
+        cli_<format>      spotcli write path, --format <format>
+
+    Use:
+        $ python benchmarks/bench_pipeline.py --records 200000 --page-size 1000
+        $ python benchmarks/bench_pipeline.py --cases fetch cli_ndjson --json
+
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import contextlib
+import subprocess
+
+
+# benchmark the working tree, not an installed spotlib
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [here, os.path.dirname(here)]
+
+region = 'us-east-1'
+cases = [
+    'source', 'fetch', 'fetch_dtstrings', 'generate', 'generate_compact',
+    'utc_conversion', 'cli_json', 'cli_ndjson', 'cli_parquet', 'cli_sqlite'
+]
+
+
+def peak_rss():
+    """Peak resident set size of this process in MiB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def case_source(args):
+    from synthetic import page, page_count
+    start, count = time.perf_counter(), 0
+    for number in range(page_count(args.records, args.page_size)):
+        count += len(page(region, args.records, args.page_size, number)['SpotPriceHistory'])
+    return time.perf_counter() - start, count
+
+
+def _fetch(args, dt_string):
+    from synthetic import spotprices
+    sp = spotprices([region], args.records, args.page_size, args.stubber)
+    start, count = time.perf_counter(), 0
+    for _ in sp._spotprice_generator(region, dt_string=dt_string):
+        count += 1
+    return time.perf_counter() - start, count
+
+
+def case_fetch(args):
+    return _fetch(args, False)
+
+
+def case_fetch_dtstrings(args):
+    return _fetch(args, True)
+
+
+def _generate(args, compact):
+    from synthetic import spotprices
+    sp = spotprices([region], args.records, args.page_size, args.stubber)
+    start = time.perf_counter()
+    prices = sp.generate_pricedata([region], compact=compact)
+    return time.perf_counter() - start, len(prices['SpotPriceHistory'])
+
+
+def case_generate(args):
+    return _generate(args, False)
+
+
+def case_generate_compact(args):
+    return _generate(args, True)
+
+
+def case_utc_conversion(args):
+    from synthetic import record
+    from spotlib.core.utc import UtcConversion
+    prices = {'SpotPriceHistory': [record(region, x) for x in range(args.records)]}
+    start = time.perf_counter()
+    UtcConversion(prices)
+    return time.perf_counter() - start, len(prices['SpotPriceHistory'])
+
+
+def _cli(args, output):
+    import spotlib
+    from synthetic import spotprices
+    from spotlib import cli
+
+    sp = spotprices([region], args.records, args.page_size, args.stubber)
+    spotlib.SpotPrices = lambda **kwargs: sp
+    argv = [
+        'spotcli', '-r', region, '-s', '2020-01-01T00:00:00', '-e', '2020-01-02T00:00:00',
+        '-f', output
+    ]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cwd = os.getcwd()
+        os.chdir(tmpdir)
+        sys.argv = argv
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                cli.init()
+                elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    return elapsed, args.records
+
+
+def run_case(args):
+    """Runs one case in this process; prints its result as json"""
+    if args.case.startswith('cli_'):
+        elapsed, count = _cli(args, args.case[4:])
+    else:
+        elapsed, count = globals()['case_' + args.case](args)
+    print(json.dumps({
+        'case': args.case,
+        'records': count,
+        'seconds': round(elapsed, 3),
+        'records_per_s': round(count / elapsed) if elapsed else None,
+        'peak_rss_mb': round(peak_rss(), 1)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('Use:')[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=100000, help='records per region')
+    parser.add_argument('--page-size', type=int, default=1000, help='records per page')
+    parser.add_argument('--cases', nargs='*', default=cases, choices=cases)
+    parser.add_argument('--case', choices=cases, help=argparse.SUPPRESS)
+    parser.add_argument('--stubber', action='store_true',
+                        help='queue responses on botocore.stub.Stubber (validated, held in memory)')
+    parser.add_argument('--json', action='store_true', help='print results as json')
+    args = parser.parse_args()
+
+    if args.case:
+        return run_case(args)
+
+    results = []
+    for case in args.cases:
+        command = [
+            sys.executable, os.path.abspath(__file__), '--case', case,
+            '--records', str(args.records), '--page-size', str(args.page_size)
+        ] + (['--stubber'] if args.stubber else [])
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if process.returncode != 0:
+            error = process.stderr.decode('utf-8').strip().splitlines()
+            results.append({'case': case, 'error': error[-1] if error else 'failed'})
+            continue
+        results.append(json.loads(process.stdout.decode('utf-8').strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+
+    print('{:<18} {:>10} {:>9} {:>14} {:>13}'.format('case', 'records', 'seconds', 'records/s', 'peak RSS MiB'))
+    for result in results:
+        if 'error' in result:
+            print('{:<18} error: {}'.format(result['case'], result['error']))
+            continue
+        print('{:<18} {:>10} {:>9.3f} {:>14,} {:>13.1f}'.format(
+            result['case'], result['records'], result['seconds'],
+            result['records_per_s'], result['peak_rss_mb']))
+
+
+if __name__ == '__main__':
+    main()
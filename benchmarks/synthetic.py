@@ -0,0 +1,147 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Synthetic describe_spot_price_history responses for offline
+    benchmarks.  Series (availability zone, instance type, product
+    description) and prices are those of spotlib.mock.SyntheticHistory;
+    records are addressed by index so that any page is generated in
+    constant time and memory.
+
+        - SyntheticStub serves pages generated on demand from a botocore
+          before-call handler, the mechanism botocore.stub.Stubber is
+          built on, so the response set is never held in memory and does
+          not distort peak RSS measurements.
+        - stub_responses queues the same pages on a botocore Stubber,
+          which validates them against the EC2 service model; suited to
+          small record counts.
+
+"""
+import datetime
+import functools
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.stub import Stubber
+from spotlib.core import EC2SpotPrices
+from spotlib.mock import SyntheticHistory
+
+
+history = SyntheticHistory()
+
+end_dt = datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc)
+
+
+@functools.lru_cache(maxsize=None)
+def series(region):
+    """Series of a region, ordered by zone within instance type within product"""
+    return sorted(history.series(region), key=lambda x: (x[2], x[1], x[0]))
+
+
+def record(region, index):
+    """
+    Deterministic spot price dict number index of a region.  Timestamps
+    descend, as returned by AWS, in clusters of one price change of many
+    instance types at the same second.
+    """
+    zone, instance_type, product = series(region)[index % len(series(region))]
+    base = history.base_price(instance_type, product) * history.discount
+    return {
+        'AvailabilityZone': zone,
+        'InstanceType': instance_type,
+        'ProductDescription': product,
+        'SpotPrice': '%.6f' % (base * (0.7 + 0.6 * (index * 7919 % 100000) / 100000)),
+        'Timestamp': end_dt - datetime.timedelta(seconds=(index // 16) * 37)
+    }
+
+
+def page(region, records, page_size, number):
+    """describe_spot_price_history response of page number (0, 1, ...)"""
+    first = number * page_size
+    last = min(records, first + page_size)
+    response = {
+        'SpotPriceHistory': [record(region, x) for x in range(first, last)],
+        'ResponseMetadata': {'HTTPStatusCode': 200, 'HTTPHeaders': {}, 'RetryAttempts': 0}
+    }
+    if last < records:
+        response['NextToken'] = str(number + 1)
+    return response
+
+
+def page_count(records, page_size):
+    return max(1, -(-records // page_size))
+
+
+class SyntheticStub():
+    """
+    Serves synthetic describe_spot_price_history pages to a boto3 ec2
+    client, honouring NextToken and MaxResults of each request
+
+    Use:
+        >>>  SyntheticStub(client, 'us-east-1', records=100000).activate()
+    """
+    def __init__(self, client, region, records, page_size=1000):
+        self.client = client
+        self.region = region
+        self.records = records
+        self.page_size = page_size
+        self.calls = 0
+
+    def _handler(self, params, **kwargs):
+        body = params.get('body', params)
+        size = int(body.get('MaxResults', self.page_size))
+        number = int(body.get('NextToken') or 0)
+        self.calls += 1
+        return AWSResponse('https://ec2.amazonaws.com', 200, {}, None), \
+            page(self.region, self.records, size, number)
+
+    def activate(self):
+        self.client.meta.events.register('before-call.ec2.DescribeSpotPriceHistory', self._handler)
+        return self
+
+    def deactivate(self):
+        self.client.meta.events.unregister('before-call.ec2.DescribeSpotPriceHistory', self._handler)
+
+
+def stub_responses(client, region, records, page_size=1000):
+    """
+    Queues all pages on an activated botocore Stubber
+
+    Returns:
+        botocore.stub.Stubber
+    """
+    stubber = Stubber(client)
+    for number in range(page_count(records, page_size)):
+        response = page(region, records, page_size, number)
+        response.pop('ResponseMetadata')
+        stubber.add_response('describe_spot_price_history', response)
+    stubber.activate()
+    return stubber
+
+
+def spotprices(regions=('us-east-1',), records=100000, page_size=1000, stubber=False, **kwargs):
+    """
+    EC2SpotPrices whose clients are served synthetic pages of records
+    spot price dicts per region.  Rate limiting is disabled.
+
+    Returns:
+        EC2SpotPrices
+    """
+    kwargs.setdefault('rate_limit', None)
+    sp = EC2SpotPrices(page_size=page_size, verify_credentials=False, **kwargs)
+    sp.session = boto3.session.Session(
+        aws_access_key_id='benchmark', aws_secret_access_key='benchmark', region_name=regions[0]
+    )
+    sp.regions = regions
+    sp.stubs = []
+
+    for region in regions:
+        # the client of the region as configured by EC2SpotPrices
+        client = sp._client(region)
+        if stubber:
+            sp.stubs.append(stub_responses(client, region, records, page_size))
+        else:
+            sp.stubs.append(SyntheticStub(client, region, records, page_size).activate())
+    return sp
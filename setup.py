@@ -32,11 +32,16 @@
 
 requires = [
     'boto3>=1.12.1',
-    'libtools>=0.3.3',
-    'pytz>=2018.3'
+    'libtools>=0.3.3'
 ]
 
 
+extras = {
+    'parquet': ['pyarrow>=1.0.0'],
+    'zstd': ['zstandard>=0.15.0']
+}
+
+
 _project = 'spotlib'
 _root = os.path.abspath(os.path.dirname(__file__))
 
@@ -66,7 +71,7 @@ def _set_pythonpath():
 
 def module_dir():
     """Filsystem location of Python3 modules"""
-    bin_path = which('python3.6') or which('python3.7')
+    bin_path = which('python3.7') or which('python3')
     bin = bin_path.split('/')[-1]
     if 'local' in bin:
         return '/usr/local/lib/' + bin + '/site-packages'
@@ -107,7 +112,6 @@ def read(fname):
     classifiers=[
         'Topic :: Software Development :: Libraries :: Python Modules',
         'Development Status :: 3 - Alpha',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
         'Operating System :: POSIX :: Linux',
@@ -115,7 +119,8 @@ def read(fname):
     keywords='Amazon AWS EC2 spot prices lambda reports cost management',
     packages=find_packages(exclude=['assets', 'docs', 'reports', 'scripts', 'tests']),
     install_requires=requires,
-    python_requires='>=3.6, <4',
+    extras_require=extras,
+    python_requires='>=3.7, <4',
     entry_points={
         'console_scripts': [
             'spotcli=spotlib.cli:init'
@@ -1,3 +1,4 @@
+import importlib
 from spotlib._version import __version__ as version
 from spotlib.statics import local_config
 
@@ -17,9 +18,26 @@
     logd.local_config = local_config
     logger = logd.getLogger(__version__)
 
-    from spotlib.core import EC2SpotPrices as SpotPrices
-    from spotlib.core import DurationEndpoints
-    from spotlib.core import UtcConversion, utc_conversion
-
 except Exception:
     pass
+
+
+# public classes imported on first access; spotlib.core loads boto3
+_exports = {
+    'SpotPrices': ('spotlib.core.spotcore', 'EC2SpotPrices'),
+    'DurationEndpoints': ('spotlib.core.endpoints', 'DurationEndpoints'),
+    'UtcConversion': ('spotlib.core.utc', 'UtcConversion'),
+    'utc_conversion': ('spotlib.core.utc', 'utc_conversion')
+}
+
+
+def __getattr__(name):
+    if name in _exports:
+        module, attribute = _exports[name]
+        globals()[name] = value = getattr(importlib.import_module(module), attribute)
+        return value
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
@@ -29,13 +29,16 @@
 import json
 import inspect
 import argparse
+import contextlib
 import subprocess
-import boto3
-from botocore.exceptions import ClientError
 from libtools import stdout_message
 from libtools.js import export_iterobject
-from spotlib import SpotPrices, UtcConversion
+from spotlib.common import compression
+from spotlib.core.columnar import CategoryTable
+from spotlib.core.metrics import metrics
 from spotlib.help_menu import menu_body
+from spotlib.profiling import Profiler
+from spotlib.writers import JsonWriter, writers
 from spotlib import about, logger
 from spotlib.variables import acct, bd, bdwt, bbc, bl, bbl, btext, fs, rst
 
@@ -131,16 +134,36 @@ def options(parser, help_menu=False):
     # default datetime objects when no custom datetimes supplied
     start_dt, end_dt = default_endpoints()
 
+    parser.add_argument("-c", "--compress", dest='compress', choices=sorted(compression), default=None, required=False)
+    parser.add_argument("--checkpoint", dest='checkpoint', nargs=1, default=None, required=False)
     parser.add_argument("-C", "--configure", dest='configure', action='store_true', required=False)
+    parser.add_argument("--az", dest='az', nargs=1, default=None, required=False)
+    parser.add_argument("--database", dest='database', nargs=1, default=None, required=False)
     parser.add_argument("-d", "--debug", dest='debug', action='store_true', default=False, required=False)
     parser.add_argument("-e", "--end", dest='end', nargs=1, default=end_dt, required=False)
+    parser.add_argument("--endpoint-url", dest='endpoint_url', nargs=1, default=None, required=False)
+    parser.add_argument("-f", "--format", dest='format', choices=sorted(writers), default='json', required=False)
     parser.add_argument("-h", "--help", dest='help', action='store_true', required=False)
+    parser.add_argument("--incremental", dest='incremental', action='store_true', default=False, required=False)
+    parser.add_argument("-i", "--instance-types", dest='instance_types', nargs='*', default=None, required=False)
+    parser.add_argument("--metrics", dest='metrics', nargs=1, default=None, required=False)
+    parser.add_argument("-o", "--os", dest='os', nargs='*', default=None, required=False)
+    parser.add_argument("--profile-cpu", dest='profile_cpu', nargs=1, default=None, required=False)
+    parser.add_argument("--profile-mem", dest='profile_mem', nargs='?', const='spotcli-memory.txt',
+                        default=None, required=False)
     parser.add_argument("-p", "--profile", dest='profile', nargs=1, default='default', required=False)
     parser.add_argument("-r", "--region", dest='region', nargs='*', default=[], required=False)
     parser.add_argument("-D", "--duration-days", dest='duration', nargs='*', default=None, required=False)
     parser.add_argument("-s", "--start", dest='start', nargs=1, default=start_dt, required=False)
+    parser.add_argument("--shards", dest='shards', type=int, default=1, required=False)
+    parser.add_argument("--stream", dest='stream', action='store_true', default=False, required=False)
     parser.add_argument("-V", "--version", dest='version', action='store_true', required=False)
-    return parser.parse_known_args()
+    args, unknown = parser.parse_known_args()
+
+    # reject format and codec pairs the writer cannot produce before any fetch
+    if args.compress not in writers[args.format].codecs:
+        raise ValueError('{} output does not support {} compression'.format(args.format, args.compress))
+    return args, unknown
 
 
 def package_version():
@@ -202,6 +225,64 @@ def writeout_data(key, jsonobject, filename):
         return False
 
 
+# optional dependencies => setup.py extras_require key installing them
+optional_packages = {'pyarrow': 'parquet', 'zstandard': 'zstd'}
+
+# database written by --format sqlite when --database is not given
+default_database = 'spotprices.sqlite'
+
+
+def export_stream(sp, region, filename, categories, writer=JsonWriter, compress=None, append=False,
+                  store=None):
+    """
+        Streams spot price data for a region directly to the local
+        filesystem, one api page at a time
+
+    Args:
+        :sp (SpotPrices): configured spot price retriever
+        :region (str): AWS region code (e.g. us-east-1)
+        :filename (str): path of the file written
+        :categories (CategoryTable): accumulates distinct instance types,
+            availability zones and product descriptions
+        :writer (class): streaming writer from spotlib.writers
+        :compress (str): compression codec applied while writing (gzip, xz, zstd)
+        :append (bool): add to an existing file; writers with appendable set only.
+            The file is first truncated to the offset recorded in the checkpoint
+        :store (SpotPriceStore): open database shared by all regions; written to
+            in place of a file opened per region, and left open
+
+    Returns:
+        Success | Failure, TYPE: bool
+
+    """
+    options = {'compress': compress, 'append': True} if append else {'compress': compress}
+    offset = sp.checkpoint.offset(region) if append and sp.checkpoint is not None else None
+    if offset is not None:
+        options['offset'] = offset
+    try:
+        with contextlib.nullcontext(store) if store is not None else writer(filename, **options) as handle:
+            # checkpointed pages are recorded once written to the file; appendable
+            # writers resume from the checkpoint, other formats restart the region
+            flush = handle.flush if sp.checkpoint is not None and writer.appendable else None
+            pages = sp.stream_pricedata(regions=[region], dtstrings=writer.dtstrings, pages=True, flush=flush)
+            for page in pages:
+                with metrics.timer('write', region):
+                    handle.write_many(page)
+                categories.update(page)
+
+    except ImportError as e:
+        extra = optional_packages.get(e.name, e.name)
+        stdout_message(f'Writing {filename} requires the {e.name} package: pip install spotlib[{extra}]',
+                       prefix='WARN')
+        return False
+
+    except (OSError, ValueError) as e:
+        fx = inspect.stack()[0][3]
+        logger.exception(f'{fx}: Problem writing {filename} to local filesystem: {e}')
+        return False
+    return True
+
+
 def writeout_status(key, region, filename, finished):
     """Display current status message to user"""
     fregion = fs + region + '/' + rst       # formatted region
@@ -235,6 +316,12 @@ def init():
         package_version()
 
     elif (args.start and args.end) or args.duration:
+        profiler = Profiler(cpu=args.profile_cpu[0] if args.profile_cpu else None, memory=args.profile_mem)
+        profiler.start(regions=' '.join(args.region) or None, format=args.format, shards=args.shards)
+
+        # imported here so that --help and --version do not load boto3
+        from spotlib import SpotPrices, UtcConversion
+
         args.profile = args.profile[0] if isinstance(args.profile, list) else args.profile
 
         # set local region
@@ -243,46 +330,135 @@ def init():
         # validate prerun conditions
         defaults = precheck(args.debug, args.region)
 
-        sp = SpotPrices(profile=args.profile)
+        if args.metrics:
+            metrics.enable()
+
+        sp = SpotPrices(
+                profile=args.profile,
+                shards=args.shards,
+                instance_types=args.instance_types,
+                product_descriptions=args.os,
+                availability_zone=args.az[0] if args.az else None,
+                incremental=args.incremental,
+                checkpoint=args.checkpoint[0] if args.checkpoint else None,
+                endpoint_url=args.endpoint_url[0] if args.endpoint_url else None,
+                verify_credentials=not args.endpoint_url
+            )
+
+        # option defaults are datetimes; values given on the command line are lists
+        args.start = args.start[0] if isinstance(args.start, list) else args.start
+        explicit_end = isinstance(args.end, list)
+        args.end = args.end[0] if explicit_end else args.end
 
         if args.duration and isinstance(int(args.duration[0]), int):
             start, end = sp.set_endpoints(duration=int(args.duration[0]))
+        elif args.incremental and not explicit_end:
+            # incremental runs end at the current time unless --end is given
+            start, end = sp.set_endpoints(args.start, None)
         else:
-            start, end = sp.set_endpoints(args.start[0], args.end[0])
+            start, end = sp.set_endpoints(args.start, args.end)
+
+        # distinct ec2 instance size types across regions
+        categories = CategoryTable(fields=('InstanceType',))
+
+        # output format; compressed and formats other than json are always streamed
+        writer = writers[args.format]
+        streaming = args.stream or args.compress or args.format != 'json'
+        suffix = writer.suffix(args.compress)
+
+        # checkpointed runs skip regions written by a previous run
+        checkpoint, completed = sp.checkpoint, []
 
-        # global container for ec2 instance size types
-        instance_sizes = []
+        # sqlite output of all regions is added to a single database
+        store = None
+        if args.format == 'sqlite':
+            store = writer(args.database[0] if args.database else default_database)
+
+        queried = sp.filter_regions(args.region)
 
         for region in args.region:
+            if region not in queried:
+                stdout_message(f'Skipping {region}: availability zone {sp.availability_zone} is in another region',
+                               prefix='OK')
+                continue
+
+            # incremental runs start each region at its watermark
+            window_start, window_end, _ = sp.fetch_window(region)
+            profiler.section(region, region=region, start=window_start, end=window_end)
+
+            if window_start >= window_end:
+                stdout_message(f'Skipping {region}: no price data after {window_start}', prefix='OK')
+                continue
 
             fname = '_'.join(
                         [
-                            start.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                            end.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                            'all-instance-spot-prices.json'
+                            window_start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                            window_end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                            'all-instance-spot-prices' + suffix
                         ]
                     )
 
-            prices = sp.generate_pricedata(regions=[region])
+            # write to file on local filesystem; name identifies the region and window
+            name = os.path.join(region, fname)
+            if store is None:
+                key = name
+                os.makedirs(region) if not os.path.exists(region) else True
+            else:
+                key = store.filename
+
+            append = False
+            if checkpoint is not None:
+                if checkpoint.completed(name) and os.path.exists(key):
+                    stdout_message(f'Skipping {region}: {name} written by a previous run', prefix='OK')
+                    completed.append(name)
+                    continue
+
+                # resume a partially written region where appendable, else restart it
+                append = writer.appendable and streaming and os.path.exists(key) and checkpoint.started(region)
+                if not append:
+                    checkpoint.discard(region)
+
+            if streaming:
+                _completed = export_stream(sp, region, key, categories, writer, args.compress, append, store)
+
+            else:
+                prices = sp.generate_pricedata(regions=[region])
+
+                # conversion of datetime obj => utc strings
+                uc = UtcConversion(prices)
+                with metrics.timer('write', region):
+                    _completed = export_iterobject(prices, key)
+                categories.update(prices['SpotPriceHistory'])
+
+            # user status message
+            if store is None:
+                writeout_status(key, region, fname, _completed)
+            elif _completed:
+                stdout_message(f'Added {fs + region + rst} price data to {bbl + key + rst}', prefix='OK')
+            else:
+                stdout_message(f'Problem adding {region} price data to {key}', prefix='WARN')
 
-            # conversion of datetime obj => utc strings
-            uc = UtcConversion(prices)
+            if metrics.enabled and store is None and os.path.exists(key):
+                metrics.count('bytes_written', os.path.getsize(key), region)
 
-            # write to file on local filesystem
-            key = os.path.join(region, fname)
-            os.makedirs(region) if not os.path.exists(region) else True
-            _completed = export_iterobject(prices, key)
+            if checkpoint is not None and _completed and checkpoint.done(region):
+                checkpoint.complete(name)
+                completed.append(name)
 
-            # user status message
-            writeout_status(key, region, fname, _completed)
+        if store is not None:
+            store.close()
+
+        if checkpoint is not None and len(completed) == len(args.region):
+            checkpoint.clear()
+
+        if args.metrics:
+            stdout_message(f'Wrote pipeline metrics to {metrics.save(args.metrics[0])}', prefix='OK')
 
-            # build unique collection of instances for this region
-            regional_sizes = list(set([x['InstanceType'] for x in prices['SpotPriceHistory']]))
-            instance_sizes.extend(regional_sizes)
+        for path in profiler.stop():
+            stdout_message(f'Wrote profile report {path}', prefix='OK')
 
         # instance sizes across analyzed regions
-        instance_sizes = list(set(instance_sizes))
-        instance_sizes.sort()
+        instance_sizes = sorted(categories.categories('InstanceType'))
         key = 'instanceTypes'
         date = sp.end.strftime("%Y-%m-%d")
         return writeout_data(key, instance_sizes, date + '_spot-instanceTypes.json')
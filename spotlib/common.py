@@ -6,6 +6,8 @@
 """
 import os
 import sys
+import gzip
+import lzma
 import json
 import inspect
 import logging
@@ -19,6 +21,65 @@
 logger.setLevel(logging.INFO)
 
 
+# supported compression codecs:  (filename extension, magic number)
+compression = {
+    'gzip': ('.gz', b'\x1f\x8b'),
+    'xz': ('.xz', b'\xfd7zXZ\x00'),
+    'zstd': ('.zst', b'\x28\xb5\x2f\xfd')
+}
+
+
+def compression_codec(filename):
+    """
+    Summary:
+        Identifies the compression codec of a file from its magic number
+    Args:
+        :filename (str): block filesystem object
+    Returns:
+        codec name (gzip, xz, zstd), or None if uncompressed, TYPE: str
+    """
+    with open(filename, 'rb') as handle:
+        header = handle.read(6)
+
+    for codec, (extension, magic) in compression.items():
+        if header.startswith(magic):
+            return codec
+    return None
+
+
+def open_file(filename, mode='rt', compress=None):
+    """
+    Summary:
+        Opens a file with streaming (de)compression.  When reading, the
+        codec is detected from the file contents; uncompressed files are
+        opened as-is
+    Args:
+        :filename (str): block filesystem object
+        :mode (str): file mode, text ('rt', 'wt') or binary ('rb', 'wb')
+        :compress (str): codec used when writing: gzip, xz, zstd or None
+    Returns:
+        file object
+    """
+    codec = compression_codec(filename) if mode.startswith('r') else compress
+
+    if codec is None:
+        return open(filename, mode)
+    elif codec == 'gzip':
+        return gzip.open(filename, mode)
+    elif codec == 'xz':
+        return lzma.open(filename, mode)
+    elif codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            logger.critical(
+                '%s: zstd compression requires the zstandard package (pip install spotlib[zstd])' %
+                inspect.stack()[0][3])
+            raise e
+        return zstandard.open(filename, mode)
+    raise ValueError('Unsupported compression codec: {}'.format(codec))
+
+
 def get_os(detailed=False):
     """
     Summary:
@@ -68,15 +129,16 @@ def get_os(detailed=False):
 def import_file_object(filename):
     """
     Summary:
-        Imports block filesystem object
+        Imports block filesystem object; gzip, xz or zstd
+        compressed files are decompressed transparently
     Args:
         :filename (str): block filesystem object
     Returns:
         dictionary obj (valid json file), file data object
     """
     try:
-        handle = open(filename, 'r')
-        file_obj = handle.read()
+        with open_file(filename, 'rt') as handle:
+            file_obj = handle.read()
         dict_obj = json.loads(file_obj)
 
     except OSError as e:
@@ -1,3 +1,4 @@
+import importlib
 from spotlib._version import __version__ as version
 
 
@@ -6,7 +7,24 @@
 __email__ = "blakeca00@gmail.com"
 
 
-from spotlib.core.ancillary import session_selector
-from spotlib.core.endpoints import DurationEndpoints
-from spotlib.core.spotcore import EC2SpotPrices
-from spotlib.core.utc import UtcConversion, utc_conversion
+# public classes and functions imported on first access; boto3 is
+# loaded only when a module using it is
+_exports = {
+    'session_selector': 'spotlib.core.ancillary',
+    'DurationEndpoints': 'spotlib.core.endpoints',
+    'EC2SpotPrices': 'spotlib.core.spotcore',
+    'UtcConversion': 'spotlib.core.utc',
+    'utc_conversion': 'spotlib.core.utc',
+    'utc_cache_info': 'spotlib.core.utc'
+}
+
+
+def __getattr__(name):
+    if name in _exports:
+        globals()[name] = value = getattr(importlib.import_module(_exports[name]), name)
+        return value
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
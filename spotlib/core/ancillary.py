@@ -10,15 +10,33 @@
           in deployments such as AWS Lambda.
         - if nothing in the environment, utilises credentials
           tied to a profile_name in the local awscli configuration.
+        - authenticated sessions are cached for the life of the
+          process (subject to a ttl) to avoid repeated sts calls.
 
 """
 import os
 import sys
+import time
+import hashlib
 import inspect
+import threading
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError, ProfileNotFound
 from libtools.oscodes_unix import exit_codes
 from spotlib import logger
+from spotlib.core.metrics import metrics
+
+
+# credential key => (session, expiry in time.monotonic() seconds, verified)
+_sessions = {}
+_lock = threading.Lock()
+
+# credential key => lock held while a session of the key is created, so that
+# sts calls for one credential set do not wait on those of another
+_key_locks = {}
+
+# seconds an authenticated session is reused before verifying again
+SESSION_TTL = 900
 
 
 def authenticated(botosession):
@@ -69,7 +87,29 @@ def authenticated(botosession):
     return False
 
 
-def session_selector(profile):
+def _credential_key(profile):
+    """
+        Cache key identifying the credential set session_selector
+        would use; environment credentials are hashed, never stored
+    """
+    if profile is not None:
+        return ('profile', profile)
+
+    credentials = [os.environ.get(x) or '' for x in (
+        'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN')]
+
+    if credentials[0] and credentials[1]:
+        return ('env', hashlib.sha256('|'.join(credentials).encode('utf-8')).hexdigest())
+    return ('default', None)
+
+
+def clear_session_cache():
+    """Discards all cached sessions; the next session_selector call re-authenticates"""
+    with _lock:
+        _sessions.clear()
+
+
+def session_selector(profile, verify=True, ttl=SESSION_TTL):
     """
         Creates a boto3 session object after examining
         available credential set(s).  session selector
@@ -83,15 +123,47 @@ def session_selector(profile):
                local attempts to utilise awscli credentials
                from local disk.
 
+        Sessions are cached per profile or environment credential
+        set for ttl seconds, so repeated calls within a process
+        make a single sts round-trip.
+
     Args:
         :profile (str):  Optional awscli profile_name
             corresponding to a set of credentials stored
             in the local awscli configuration
+        :verify (bool): False trusts the credentials found without
+            an sts get_caller_identity call. DEFAULT: True
+        :ttl (int): seconds a session is reused from the cache;
+            0 disables caching. DEFAULT: 900
 
     Returns:
         instantiated session, TYPE:  boto3 object
 
     """
+    key = _credential_key(profile)
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _lock:
+            session, expiry, verified = _sessions.get(key, (None, 0, False))
+
+        if session is None or expiry <= time.monotonic() or (verify and not verified):
+            with metrics.timer('auth'):
+                session = _select_session(profile, verify)
+            if ttl:
+                with _lock:
+                    _sessions[key] = (session, time.monotonic() + ttl, verify)
+    return session
+
+
+def _select_session(profile, verify=True):
+    """
+        Builds a session following the hierarchy described
+        in session_selector.  Exits if no valid credentials
+        are found.
+    """
     access_key = os.environ.get('AWS_ACCESS_KEY_ID')
     secret_key = os.environ.get('AWS_SECRET_ACCESS_KEY')
     token = os.environ.get('AWS_SESSION_TOKEN')
@@ -102,7 +174,7 @@ def session_selector(profile):
 
         if profile is not None:
             session_profile = boto3.Session(profile_name=profile)
-            if authenticated(session_profile):
+            if not verify or authenticated(session_profile):
                 return session_profile
 
         elif access_key and secret_key and token:
@@ -111,7 +183,7 @@ def session_selector(profile):
                     aws_secret_access_key=secret_key,
                     aws_session_token=token
                 )
-            if authenticated(session_env1):
+            if not verify or authenticated(session_env1):
                 return session_env1
 
         elif access_key and secret_key:
@@ -119,11 +191,11 @@ def session_selector(profile):
                     aws_access_key_id=access_key,
                     aws_secret_access_key=secret_key
                 )
-            if authenticated(session_env2):
+            if not verify or authenticated(session_env2):
                 return session_env2
 
         session = boto3.Session()
-        if authenticated(session):
+        if not verify or authenticated(session):
             return session
 
     except ClientError as e:
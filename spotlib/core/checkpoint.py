@@ -0,0 +1,207 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Class:  Checkpoint
+        - persists the pagination state (region, time window,
+          NextToken, record count) of each paginated request to
+          a local json file as pages are consumed, so that an
+          interrupted retrieval resumes at the page where it stopped.
+
+"""
+import os
+import json
+import hashlib
+import inspect
+import threading
+from botocore.paginate import TokenEncoder
+from spotlib import logger
+
+
+def resume_token(next_token):
+    """PaginationConfig StartingToken resuming pagination at the page of NextToken"""
+    return TokenEncoder().encode({'NextToken': next_token}) if next_token else None
+
+
+class CheckpointPage(list):
+    """
+    Page (list) of spot price dicts carrying the pagination state
+    reached once the page is consumed: (key, NextToken, record count)
+    """
+    __slots__ = ('state',)
+
+    def __init__(self, records, state):
+        super().__init__(records)
+        self.state = state
+
+    @staticmethod
+    def derive(page, records):
+        """Returns records, a subset of page, carrying the pagination state of page"""
+        state = getattr(page, 'state', None)
+        return records if state is None else CheckpointPage(records, state)
+
+
+class Checkpoint():
+    """
+    Json file of pagination state keyed by region, time window and
+    request filters.  A window is done once its last page is consumed.
+    Units of work outside of pagination (e.g. output files) are marked
+    with complete(name).
+
+    Use:
+        >>>  checkpoint = Checkpoint('spotprices.checkpoint')
+        >>>  sp = EC2SpotPrices(checkpoint='spotprices.checkpoint')
+    """
+    def __init__(self, path):
+        """
+        Args:
+            :path (str): location of the json checkpoint file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.active = {}                # region => window keys used by this process
+        self.state = self._load()
+
+    @staticmethod
+    def key(region, start, end, params=None):
+        """
+            Checkpoint key of a region, time window and describe_spot_price_history
+            filters.  A NextToken is only valid for the request that returned it,
+            so the window is part of the key.  Incremental runs without an end
+            time end at the current time; their windows, and so their keys,
+            differ from one run to the next, and an interrupted incremental run
+            restarts from its watermark rather than resuming.
+        """
+        digest = hashlib.sha1(json.dumps(params or {}, sort_keys=True).encode('utf-8')).hexdigest()
+        return ':'.join([region, start.isoformat(), end.isoformat(), digest[:16]])
+
+    def register(self, key, region, start, end):
+        """
+            Records a window of a region about to be paginated
+
+        Returns:
+            pagination state of the window, TYPE: dict
+        """
+        with self.lock:
+            self.active.setdefault(region, []).append(key)
+            return dict(self.state['windows'].setdefault(key, {
+                'region': region,
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'token': None,
+                'count': 0,
+                'done': False
+            }))
+
+    def starting_token(self, key):
+        """
+            PaginationConfig StartingToken resuming a window after the last
+            page consumed, or None if the window has not been started
+        """
+        return resume_token(self.get(key).get('token'))
+
+    def get(self, key):
+        with self.lock:
+            return dict(self.state['windows'].get(key, {}))
+
+    def advance(self, key, token, count, offset=None):
+        """
+            Records a consumed page of a window
+
+        Args:
+            :key (str): window checkpoint key
+            :token (str): NextToken of the page; None if it was the last page
+            :count (int): number of records in the page
+            :offset (int): size in bytes of the output file of the window's
+                region once the page was written to it; see offset
+        """
+        with self.lock:
+            window = self.state['windows'][key]
+            window['token'] = token
+            window['count'] += count
+            window['done'] = token is None
+            if offset is not None:
+                self.state['offsets'][window['region']] = offset
+            self._save()
+
+    def offset(self, region):
+        """
+            Size in bytes of the output file of a region when its last
+            recorded page was written, or None if no offset was recorded.
+            A resumed run truncates the file to this size before appending,
+            discarding output written after the checkpoint last advanced.
+        """
+        with self.lock:
+            return self.state['offsets'].get(region)
+
+    def done(self, region):
+        """True if every window of the region paginated by this process is done"""
+        with self.lock:
+            keys = self.active.get(region, [])
+            return bool(keys) and all(self.state['windows'][x]['done'] for x in keys)
+
+    def started(self, region):
+        """True if records of a region have been consumed in a previous run"""
+        with self.lock:
+            return any(
+                x['region'] == region and x['count'] for x in self.state['windows'].values()
+            )
+
+    def discard(self, region):
+        """Removes the pagination state of a region, restarting it from the first page"""
+        with self.lock:
+            self.state['windows'] = {
+                k: v for k, v in self.state['windows'].items() if v['region'] != region
+            }
+            self.state['offsets'].pop(region, None)
+            self.active.pop(region, None)
+            self._save()
+
+    def complete(self, name):
+        """Marks a named unit of work complete"""
+        with self.lock:
+            if name not in self.state['completed']:
+                self.state['completed'].append(name)
+                self._save()
+
+    def completed(self, name):
+        with self.lock:
+            return name in self.state['completed']
+
+    def clear(self):
+        """Removes the checkpoint file once all work is complete"""
+        with self.lock:
+            self.state = {'windows': {}, 'offsets': {}, 'completed': []}
+            self.active = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _load(self):
+        try:
+            with open(self.path) as handle:
+                state = json.load(handle)
+            return {
+                'windows': state.get('windows', {}),
+                'offsets': state.get('offsets', {}),
+                'completed': state.get('completed', [])
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning('%s: unable to read checkpoint %s: %s' % (inspect.stack()[0][3], self.path, e))
+        return {'windows': {}, 'offsets': {}, 'completed': []}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as handle:
+                json.dump(self.state, handle, indent=4)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.exception('%s: unable to persist checkpoint %s: %s' % (inspect.stack()[0][3], self.path, e))
@@ -0,0 +1,85 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Module Function:  get_client
+        - process-level cache of boto3 clients, one per session,
+          service and region, so that clients and their pooled
+          https connections are reused across regions and calls.
+        - boto3 sessions are not thread safe; client construction
+          is serialized under a lock.  Constructed clients may be
+          shared between threads.
+
+"""
+import threading
+import weakref
+from botocore.config import Config
+
+
+# session => {(service, region, max_pool_connections, endpoint_url, max_attempts): client}
+_clients = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def client_config(max_pool_connections=10, max_attempts=None):
+    """
+        botocore configuration of pooled, keep-alive connections
+
+    Args:
+        :max_pool_connections (int): maximum number of connections kept
+            in the connection pool of a client.  Should be at least the
+            number of threads calling the client concurrently.
+        :max_attempts (int): retries botocore makes of a failed request;
+            None keeps the botocore default
+
+    Returns:
+        botocore.config.Config
+    """
+    options = {'max_pool_connections': max_pool_connections}
+    if max_attempts is not None:
+        options['retries'] = {'max_attempts': max_attempts}
+    try:
+        return Config(tcp_keepalive=True, **options)
+    except TypeError:
+        # botocore < 1.27 does not support tcp_keepalive
+        return Config(**options)
+
+
+def get_client(session, service, region=None, max_pool_connections=10, endpoint_url=None,
+               max_attempts=None):
+    """
+        Returns a cached boto3 client for the session, service and
+        region given, constructing it on first use
+
+    Args:
+        :session (boto3.Session): authenticated session
+        :service (str): AWS service name (e.g. ec2)
+        :region (str): AWS region code (e.g. us-east-1); None selects
+            the default region of the session
+        :max_pool_connections (int): see client_config
+        :endpoint_url (str): url of an alternative service endpoint,
+            such as a local mock server; None selects the AWS endpoint
+        :max_attempts (int): see client_config
+
+    Returns:
+        boto3 client object
+    """
+    key = (service, region, max_pool_connections, endpoint_url, max_attempts)
+
+    with _lock:
+        clients = _clients.setdefault(session, {})
+        if key not in clients:
+            clients[key] = session.client(
+                service, region_name=region, endpoint_url=endpoint_url,
+                config=client_config(max_pool_connections, max_attempts)
+            )
+        return clients[key]
+
+
+def clear_clients():
+    """Discards all cached clients"""
+    with _lock:
+        _clients.clear()
@@ -0,0 +1,339 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Module:  compact and columnar representations of spot price data
+        - SpotPriceRecord, a __slots__ record of interned strings,
+          float price and integer epoch timestamp
+        - CategoryTable, integer codes for categorical string fields
+        - SpotPriceColumns, an array backed column store of records
+        - conversion of spot price dicts into Apache Arrow
+          RecordBatches with dictionary encoded categorical
+          columns, float64 prices and utc timestamps; requires
+          the optional pyarrow package
+
+"""
+import sys
+import calendar
+import datetime
+import inspect
+from array import array
+from spotlib import logger
+
+
+# string fields of a spot price dict with few distinct values
+categorical_fields = ('AvailabilityZone', 'InstanceType', 'ProductDescription')
+
+
+def import_pyarrow():
+    """Imports pyarrow on first use; pyarrow is an optional dependency"""
+    try:
+        import pyarrow
+    except ImportError as e:
+        logger.critical(
+            '%s: columnar output requires the pyarrow package (pip install spotlib[parquet])' %
+            inspect.stack()[0][3])
+        raise e
+    return pyarrow
+
+
+def epoch_seconds(timestamp):
+    """
+        Converts a spot price Timestamp, either a datetime object
+        or utc string (2019-08-11T23:56:50Z), to unix epoch seconds.
+        Naive datetimes are interpreted as utc.
+
+    Returns:
+        seconds since 1970-01-01T00:00:00Z, TYPE: int
+    """
+    if isinstance(timestamp, int):
+        return timestamp
+    elif isinstance(timestamp, str):
+        timestamp = datetime.datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%SZ')
+    elif timestamp.tzinfo is not None:
+        return int(timestamp.timestamp())
+    return calendar.timegm(timestamp.timetuple())
+
+
+def arrow_schema():
+    """
+        Arrow schema of spot price data:
+
+            - AvailabilityZone, InstanceType, ProductDescription:
+              dictionary<int32, string>
+            - SpotPrice:  float64
+            - Timestamp:  timestamp[s, tz=UTC]
+
+    Returns:
+        pyarrow.Schema
+    """
+    pa = import_pyarrow()
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [(field, categorical) for field in categorical_fields] +
+        [('SpotPrice', pa.float64()), ('Timestamp', pa.timestamp('s', tz='UTC'))]
+    )
+
+
+def to_recordbatch(records):
+    """
+        Converts a list of spot price dicts into an Arrow RecordBatch
+
+    Args:
+        :records (list): spot price dicts, Timestamp as datetime or utc string
+
+    Returns:
+        pyarrow.RecordBatch
+    """
+    pa = import_pyarrow()
+    schema = arrow_schema()
+    columns = [
+        pa.array([x[field] for x in records], type=pa.string()).dictionary_encode()
+        for field in categorical_fields
+    ]
+    columns.append(pa.array([float(x['SpotPrice']) for x in records], type=pa.float64()))
+    columns.append(
+        pa.array([epoch_seconds(x['Timestamp']) for x in records], type=schema.field('Timestamp').type)
+    )
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class SpotPriceRecord():
+    """
+    Compact, immutable representation of a single spot price dict.
+    Strings are interned so that records share one copy of each
+    availability zone, instance type and product description; the
+    price is a float and the timestamp integer utc epoch seconds.
+    Fields remain readable by their AWS key (record['InstanceType']).
+
+    Use:
+        >>>  r = SpotPriceRecord.from_dict(price_dict)
+        >>>  r.instance_type, r['SpotPrice']
+        ('m5d.4xlarge', 0.42)
+    """
+    __slots__ = ('availability_zone', 'instance_type', 'product_description', 'spot_price', 'timestamp')
+
+    # AWS response keys => attribute names
+    keys = {
+        'AvailabilityZone': 'availability_zone',
+        'InstanceType': 'instance_type',
+        'ProductDescription': 'product_description',
+        'SpotPrice': 'spot_price',
+        'Timestamp': 'timestamp'
+    }
+
+    def __init__(self, availability_zone, instance_type, product_description, spot_price, timestamp):
+        """
+        Args:
+            :availability_zone (str): availability zone code, e.g. eu-west-1a
+            :instance_type (str): EC2 instance type, e.g. m5d.4xlarge
+            :product_description (str): operating system, e.g. Linux/UNIX
+            :spot_price (float): price in USD per hour
+            :timestamp (int): utc epoch seconds of the price change
+        """
+        setattr_ = object.__setattr__
+        setattr_(self, 'availability_zone', sys.intern(availability_zone))
+        setattr_(self, 'instance_type', sys.intern(instance_type))
+        setattr_(self, 'product_description', sys.intern(product_description))
+        setattr_(self, 'spot_price', float(spot_price))
+        setattr_(self, 'timestamp', int(timestamp))
+
+    @classmethod
+    def from_dict(cls, price_dict):
+        """Constructs a record from a spot price dict returned by AWS"""
+        return cls(
+            price_dict['AvailabilityZone'],
+            price_dict['InstanceType'],
+            price_dict['ProductDescription'],
+            price_dict['SpotPrice'],
+            epoch_seconds(price_dict['Timestamp'])
+        )
+
+    def to_dict(self, dtstrings=False):
+        """
+            Expands the record to the spot price dict schema returned
+            by AWS.  SpotPrice is returned as a float.
+
+        Args:
+            :dtstrings (bool): True returns Timestamp as utc string, DEFAULT: False
+        """
+        dt = datetime.datetime.fromtimestamp(self.timestamp, tz=datetime.timezone.utc)
+        return {
+            'AvailabilityZone': self.availability_zone,
+            'InstanceType': self.instance_type,
+            'ProductDescription': self.product_description,
+            'SpotPrice': self.spot_price,
+            'Timestamp': dt.strftime('%Y-%m-%dT%H:%M:%SZ') if dtstrings else dt
+        }
+
+    def __getitem__(self, key):
+        return getattr(self, self.keys[key])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is immutable'.format(self.__class__.__name__))
+
+    def __eq__(self, other):
+        return isinstance(other, SpotPriceRecord) and self._tuple() == other._tuple()
+
+    def __hash__(self):
+        return hash(self._tuple())
+
+    def _tuple(self):
+        return tuple(getattr(self, x) for x in self.__slots__)
+
+    def __repr__(self):
+        return '{}({})'.format(
+            self.__class__.__name__, ', '.join(repr(x) for x in self._tuple()))
+
+
+class CategoryTable():
+    """
+    Shared lookup table mapping the values of categorical fields
+    (AvailabilityZone, InstanceType, ProductDescription) to small
+    integer codes.  Codes are assigned in order of first appearance,
+    so the code of a value is its index in categories(field).
+
+    Use:
+        >>>  table = CategoryTable()
+        >>>  table.encode('InstanceType', 'm5.large')
+        0
+        >>>  table.decode('InstanceType', 0)
+        'm5.large'
+    """
+    def __init__(self, fields=categorical_fields):
+        """
+        Args:
+            :fields (tuple): names of the categorical fields
+        """
+        self.fields = tuple(fields)
+        self.codes = {field: {} for field in self.fields}
+        self.values = {field: [] for field in self.fields}
+
+    def encode(self, field, value):
+        """Returns the code of a field value, assigning a new code if unseen"""
+        codes = self.codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self.values[field].append(sys.intern(value))
+        return code
+
+    def decode(self, field, code):
+        """Returns the field value of a code"""
+        return self.values[field][code]
+
+    def update(self, records):
+        """
+            Encodes the categorical fields of a page of spot price dicts.
+            Distinct values are collected per field by a comprehension,
+            so only values new to a page are encoded one at a time.
+        """
+        records = records if isinstance(records, list) else list(records)
+        for field in self.fields:
+            codes = self.codes[field]
+            # dict keeps the order of first appearance, unlike a set
+            for value in {x[field]: None for x in records}:
+                if value not in codes:
+                    self.encode(field, value)
+
+    def categories(self, field):
+        """Distinct values of a field, indexed by code"""
+        return list(self.values[field])
+
+    def to_dict(self):
+        """Lookup table as {field: [value, ...]}; list index is the code"""
+        return {field: self.categories(field) for field in self.fields}
+
+    def __len__(self):
+        return sum(len(x) for x in self.values.values())
+
+    def __repr__(self):
+        return '{}({})'.format(
+            self.__class__.__name__,
+            ', '.join('{}={}'.format(k, len(v)) for k, v in self.values.items()))
+
+
+class SpotPriceColumns():
+    """
+    Column store of spot price data.  Prices and timestamps are held in
+    typed arrays (float64, int64); categorical string fields as uint32
+    codes into a CategoryTable which may be shared between stores.
+    Storage is roughly 28 bytes per record compared with several hundred
+    for a spot price dict, and grouping or filtering on codes avoids
+    string comparison.
+
+    Use:
+        >>>  columns = SpotPriceColumns()
+        >>>  columns.extend(page)
+        >>>  columns[0]
+        SpotPriceRecord('eu-west-1a', 'm5d.4xlarge', 'Red Hat Enterprise Linux', 0.42, 1565567810)
+        >>>  code = columns.categories.encode('InstanceType', 'm5d.4xlarge')
+        >>>  [i for i, x in enumerate(columns.codes('InstanceType')) if x == code]
+        [0]
+    """
+    def __init__(self, records=None, categories=None):
+        """
+        Args:
+            :records (iterable): spot price dicts or SpotPriceRecords to load
+            :categories (CategoryTable): shared lookup table; DEFAULT: new table
+        """
+        self.categories = CategoryTable() if categories is None else categories
+        if set(self.categories.fields) != set(categorical_fields):
+            raise ValueError('SpotPriceColumns requires a CategoryTable of fields {}'.format(
+                ', '.join(categorical_fields)))
+        self.columns = {field: array('I') for field in self.categories.fields}
+        self.prices = array('d')
+        self.timestamps = array('q')
+        if records is not None:
+            self.extend(records)
+
+    def append(self, record):
+        """Appends a spot price dict or SpotPriceRecord"""
+        encode = self.categories.encode
+        for field, column in self.columns.items():
+            column.append(encode(field, record[field]))
+        self.prices.append(float(record['SpotPrice']))
+        self.timestamps.append(epoch_seconds(record['Timestamp']))
+
+    def extend(self, records):
+        """Appends an iterable (page) of spot price dicts or SpotPriceRecords"""
+        for record in records:
+            self.append(record)
+
+    def codes(self, field):
+        """Column of integer codes of a categorical field, TYPE: array"""
+        return self.columns[field]
+
+    def distinct(self, field):
+        """Distinct values of a categorical field present in this store"""
+        return [self.categories.decode(field, x) for x in sorted(set(self.columns[field]))]
+
+    def to_dicts(self, dtstrings=False):
+        """
+            Expands all records to spot price dicts
+
+        Args:
+            :dtstrings (bool): True returns Timestamp as utc string, DEFAULT: False
+        """
+        return [x.to_dict(dtstrings) for x in self]
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __getitem__(self, index):
+        decode, keys = self.categories.decode, SpotPriceRecord.keys
+        return SpotPriceRecord(
+            spot_price=self.prices[index],
+            timestamp=self.timestamps[index],
+            **{keys[field]: decode(field, column[index]) for field, column in self.columns.items()}
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return '{}(records={})'.format(self.__class__.__name__, len(self))
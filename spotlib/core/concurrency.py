@@ -0,0 +1,98 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Module Function:  merge_iterables
+        - consumes several iterables concurrently, one per worker
+          thread, and merges their items into a single stream in
+          order of arrival.  Used to overlap the network wait of
+          independent spot price paginators.
+
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# sentinel placed on the queue when a worker exhausts its iterable
+_DONE = object()
+
+
+class _Failure():
+    """Wraps an exception raised inside a worker thread"""
+    __slots__ = ('exc',)
+
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def merge_iterables(iterables, workers=4, maxsize=64):
+    """
+        Iterates each of the iterables supplied on a pool of worker
+        threads and yields their items as they arrive.  Items from
+        one iterable retain their relative order; no ordering is
+        guaranteed between iterables.
+
+    Args:
+        :iterables (list): iterables (generators, paginators) to consume
+        :workers (int): maximum number of iterables consumed at once
+        :maxsize (int): bound on the number of items buffered between
+            the worker threads and the consumer
+
+    Returns:
+        merged items (generator)
+
+    """
+    iterables = list(iterables)
+    if not iterables:
+        return
+
+    buffer = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _drain(iterable):
+        try:
+            if stop.is_set():
+                return
+            for item in iterable:
+                if not _put(item):
+                    return
+        except Exception as e:
+            _put(_Failure(e))
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            _put(_DONE)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(iterables))))
+
+    try:
+        for iterable in iterables:
+            pool.submit(_drain, iterable)
+
+        remaining = len(iterables)
+
+        while remaining:
+            item = buffer.get()
+            if item is _DONE:
+                remaining -= 1
+            elif isinstance(item, _Failure):
+                raise item.exc
+            else:
+                yield item
+    finally:
+        # unblocks workers when the consumer stops early or raises
+        stop.set()
+        pool.shutdown(wait=True)
@@ -29,38 +29,73 @@
 import re
 import datetime
 import inspect
-from pytz import timezone
 from spotlib import logger
 
 
-# precompiled regex pattern; datetime
-re_dt = re.compile('\d{4}-[01]\d-[0-3]\d[\sT][0-2]\d:[0-5]\d:[0-5]\d(?:\.\d+)?Z?')
+# cached utc tzinfo of all datetimes parsed from strings
+utc = datetime.timezone.utc
 
-# precompiled regex pattern; No timezone information -- NOT VALID SYNTAX
-re_notz = re.compile('\d{4}-[01]\d-[0-3]\d[\sT][0-2]\d:[0-5]\d:[0-5]\d(?:\.\d+)^Z')
+# precompiled regex pattern; ISO-8601 datetime with optional fraction and utc offset
+re_iso = re.compile(
+    r'(\d{4}-[01]\d-[0-3]\d)(?:[\sT]([0-2]\d:[0-5]\d(?::[0-5]\d)?)(?:[.,](\d+))?)?'
+    r'\s*(Z|[+-][0-2]\d:?[0-5]\d)?$', re.IGNORECASE
+)
 
-# precompiled regex pattern; datetime, no "T" separator
-re_dtnot = re.compile('\d{4}-[01]\d-[0-3]\d[\s][0-2]\d:[0-5]\d:[0-5]\d(?:\.\d+)?Z?')
 
-# precompiled regex pattern; date
-re_date = re.compile('\d{4}-[01]\d-[0-3]\d')
+def parse_datetime(dt_str):
+    """
+    Helper module function: Parses ISO-8601 datetime strings and dates
+    into timezone aware utc datetimes.  Accepts a space or "T" separator,
+    fractional seconds of any precision, and a "Z" or +HH:MM utc offset;
+    strings without offset are interpreted as utc.
 
+    Example:
+        >>>  parse_datetime('2019-09-03T08:00:00.5+02:00')
+        datetime.datetime(2019, 9, 3, 6, 0, 0, 500000, tzinfo=datetime.timezone.utc)
 
-def format_datetime(datetime_str):
+    Returns:
+        datetime object
+    """
+    dt_str = dt_str.strip()
+    try:
+        # fast path; python < 3.11 fromisoformat rejects "Z" and reduced precision fractions
+        dt = datetime.datetime.fromisoformat(
+            dt_str[:-1] + '+00:00' if dt_str[-1:] in ('Z', 'z') else dt_str)
+
+    except ValueError:
+        match = re_iso.match(dt_str)
+        if match is None:
+            raise ValueError('Unrecognized datetime string: {}'.format(dt_str))
+        date, time, fraction, offset = match.groups()
+        time = time or '00:00:00'
+        time = time + ':00' if len(time) == 5 else time
+        iso, fmt = date + 'T' + time, '%Y-%m-%dT%H:%M:%S'
+        if fraction:
+            iso, fmt = iso + '.' + fraction[:6].ljust(6, '0'), fmt + '.%f'
+        if offset and offset.upper() != 'Z':
+            iso, fmt = iso + offset.replace(':', ''), fmt + '%z'
+        dt = datetime.datetime.strptime(iso, fmt)
+
+    return dt.replace(tzinfo=utc) if dt.tzinfo is None else dt.astimezone(utc)
+
+
+def shard_windows(start, end, shards):
     """
-    Helper module function: Formats datetime strings & dates
-    (datetime with no time component)
+    Helper module function: Divides the period between two datetime
+    endpoints into contiguous sub-windows of equal length
+
+    Args:
+        :start (datetime): start of the period
+        :end (datetime): end of the period
+        :shards (int): number of sub-windows
 
     Returns:
-        datetime iso formatted string
+        list of (start, end) datetime tuples, in chronological order
     """
-    def convert_dt(datetime_str):
-        dt = datetime.datetime.strptime(datetime_str, '%Y-%m-%d %H:%M:%S')
-        return dt.isoformat()
-
-    if isinstance(datetime_str, str) and re_dt.match(datetime_str):
-        return convert_dt(datetime_str) if re_dtnot.match(datetime_str) else datetime_str
-    return ''.join([datetime_str, 'T00:00:00']) if re_date.match(datetime_str) else datetime_str
+    shards = max(1, int(shards))
+    step = (end - start) / shards
+    bounds = [start + step * i for i in range(shards)] + [end]
+    return [(bounds[i], bounds[i + 1]) for i in range(shards)]
 
 
 class DurationEndpoints():
@@ -139,8 +174,7 @@ def custom_endpoints(self, start_time=None, end_time=None):
             if all(isinstance(x, datetime.datetime) for x in [start_time, end_time]):
                 return start_time, end_time
 
-            elif any(isinstance(x, str) for x in [start_time, end_time]) \
-                and (re_dt.match(x) for x in [start_time, end_time]):
+            elif any(isinstance(x, str) for x in [start_time, end_time]):
                 start = self._convert_dt_string(start_time)
                 end = self._convert_dt_string(end_time)
 
@@ -160,9 +194,9 @@ def custom_duration(self, duration_days):
         return self.default_endpoints(duration_days)
 
     def _convert_dt_string(self, dt_str):
-        dt_format = '%Y-%m-%dT%H:%M:%S'
-        tz_stripped = datetime.datetime.strptime(format_datetime(dt_str), dt_format)
-        return tz_stripped.replace(tzinfo=timezone('UTC'))
+        if isinstance(dt_str, datetime.datetime):
+            return dt_str.replace(tzinfo=utc) if dt_str.tzinfo is None else dt_str
+        return parse_datetime(dt_str)
 
     def __str__(self):
         return self.__repr__()
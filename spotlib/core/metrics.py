@@ -0,0 +1,192 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Module:  instrumentation of the retrieval pipeline
+        - per stage timers: auth (session_selector), regions (region
+          discovery), fetch (api page requests), convert (Timestamp
+          conversion) and write (output files), per region where the
+          stage is region specific.
+        - counters of pages, records, bytes, retries and throttled
+          requests per region.
+        - exported as a summary dict, Prometheus text exposition format
+          or a json stats file.
+
+    Metrics are collected in the process-wide registry metrics, which
+    is disabled by default.  While disabled, timer returns a shared
+    no-op context manager and instrumented call sites skip counting
+    after a single attribute test.
+
+    Use:
+        >>>  from spotlib.core.metrics import metrics
+        >>>  metrics.enable()
+        >>>  prices = EC2SpotPrices().generate_pricedata(regions=['us-east-1'])
+        >>>  metrics.summary()['counters']['records']
+        {'us-east-1': 21532}
+
+"""
+import os
+import json
+import time
+import threading
+import contextlib
+
+
+# stages in pipeline order; used to order exported stages
+stages = ('auth', 'regions', 'fetch', 'convert', 'write')
+
+
+class _Timer():
+    """Accumulates the elapsed time of a with block into a registry"""
+    __slots__ = ('registry', 'key', 'start')
+
+    def __init__(self, registry, key):
+        self.registry, self.key = registry, key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.key[0], time.perf_counter() - self.start, self.key[1])
+        return False
+
+
+_null = contextlib.nullcontext()
+
+
+class Metrics():
+    """
+    Thread safe registry of stage timers and counters, keyed by
+    name and region (None for totals not specific to a region)
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.timers = {}        # (stage, region) => [calls, seconds]
+        self.counters = {}      # (name, region) => value
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+        return self
+
+    def reset(self):
+        with self.lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def timer(self, stage, region=None):
+        """
+            Context manager timing one call of a stage
+
+        Args:
+            :stage (str): pipeline stage (see stages)
+            :region (str): AWS region code, if the stage is region specific
+        """
+        return _Timer(self, (stage, region)) if self.enabled else _null
+
+    def observe(self, stage, seconds, region=None):
+        """Records one call of a stage lasting seconds"""
+        with self.lock:
+            timer = self.timers.setdefault((stage, region), [0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+
+    def count(self, name, value=1, region=None):
+        """Adds value to counter name of region; no-op while disabled"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[(name, region)] = self.counters.get((name, region), 0) + value
+
+    def summary(self):
+        """
+            Collected metrics
+
+        Returns:
+            TYPE: dict, of form
+
+            {
+                'stages': {
+                    'fetch': {'calls': 42, 'seconds': 3.2, 'regions': {'us-east-1': {...}}}
+                },
+                'counters': {'records': {'us-east-1': 21532}}
+            }
+        """
+        with self.lock:
+            timers, counters = dict(self.timers), dict(self.counters)
+
+        order = {x: i for i, x in enumerate(stages)}
+        summary = {'stages': {}, 'counters': {}}
+
+        for (stage, region), (calls, seconds) in sorted(
+                timers.items(), key=lambda x: (order.get(x[0][0], len(order)), x[0][0], x[0][1] or '')):
+            entry = summary['stages'].setdefault(stage, {'calls': 0, 'seconds': 0.0, 'regions': {}})
+            entry['calls'] += calls
+            entry['seconds'] = round(entry['seconds'] + seconds, 6)
+            if region is not None:
+                entry['regions'][region] = {'calls': calls, 'seconds': round(seconds, 6)}
+
+        for (name, region), value in sorted(counters.items(), key=lambda x: (x[0][0], x[0][1] or '')):
+            summary['counters'].setdefault(name, {})[region or 'all'] = value
+        return summary
+
+    def prometheus(self, prefix='spotlib'):
+        """
+            Collected metrics in the Prometheus text exposition format
+
+        Returns:
+            TYPE: str
+        """
+        summary = self.summary()
+        lines = [
+            '# HELP {}_stage_seconds_total Time spent in each pipeline stage.'.format(prefix),
+            '# TYPE {}_stage_seconds_total counter'.format(prefix),
+        ]
+        calls = [
+            '# HELP {}_stage_calls_total Calls of each pipeline stage.'.format(prefix),
+            '# TYPE {}_stage_calls_total counter'.format(prefix),
+        ]
+        for stage, entry in summary['stages'].items():
+            regions = entry['regions'] or {None: entry}
+            for region, values in regions.items():
+                labels = _labels(stage=stage, region=region)
+                lines.append('{}_stage_seconds_total{} {}'.format(prefix, labels, values['seconds']))
+                calls.append('{}_stage_calls_total{} {}'.format(prefix, labels, values['calls']))
+        lines.extend(calls)
+
+        for name, regions in summary['counters'].items():
+            metric = '{}_{}_total'.format(prefix, name)
+            lines.append('# TYPE {} counter'.format(metric))
+            for region, value in regions.items():
+                lines.append('{}{} {}'.format(metric, _labels(region=None if region == 'all' else region), value))
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):
+        """
+            Writes collected metrics to path; Prometheus text if path
+            ends with .prom, else json
+
+        Returns:
+            path, TYPE: str
+        """
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f1:
+            if path.endswith('.prom'):
+                f1.write(self.prometheus())
+            else:
+                f1.write(json.dumps(self.summary(), indent=4))
+        os.replace(tmp, path)
+        return path
+
+
+def _labels(**labels):
+    pairs = ['{}="{}"'.format(k, v) for k, v in labels.items() if v is not None]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+# process-wide registry used by all instrumented call sites
+metrics = Metrics()
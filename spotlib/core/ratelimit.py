@@ -0,0 +1,145 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Module:  client-side rate limiting and retry of AWS api requests
+        - TokenBucket, an adaptive token bucket shared by all requests
+          made to one region with one set of credentials.  The request
+          rate is halved each time AWS throttles a request and recovers
+          additively as requests succeed.
+        - backoff, capped exponential delays with full jitter
+        - retryable, classification of throttling and transient errors
+
+"""
+import time
+import random
+import threading
+from botocore.exceptions import ClientError, ConnectionError, ReadTimeoutError
+
+
+# error codes returned by AWS when a request is throttled
+throttle_codes = {
+    'RequestLimitExceeded', 'Throttling', 'ThrottlingException',
+    'TooManyRequestsException', 'RequestThrottled', 'RequestThrottledException'
+}
+
+# error codes of transient server side failures
+transient_codes = {'InternalError', 'InternalFailure', 'ServiceUnavailable', 'Unavailable'}
+
+# (account, region) => TokenBucket
+_buckets = {}
+_lock = threading.Lock()
+
+
+class TokenBucket():
+    """
+    Thread safe token bucket limiting the rate of requests.  Holds up to
+    burst tokens, refilled at rate tokens per second; each request takes
+    one token, waiting for a refill if the bucket is empty.
+
+    Use:
+        >>>  bucket = TokenBucket(rate=20, burst=100)
+        >>>  bucket.acquire()
+    """
+    def __init__(self, rate, burst=None, min_rate=0.5):
+        """
+        Args:
+            :rate (float): maximum sustained requests per second
+            :burst (int): bucket capacity. DEFAULT: rate
+            :min_rate (float): lower bound of the rate when throttled
+        """
+        self.max_rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = self.max_rate
+        self.burst = float(burst or max(1, rate))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def acquire(self):
+        """Takes a token, blocking until one is available"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self):
+        """Halves the request rate and empties the bucket after a throttled request"""
+        with self.lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def success(self):
+        """Recovers the request rate by 5 percent of its maximum"""
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def __repr__(self):
+        return '{}(rate={:.2f}, burst={:.0f})'.format(self.__class__.__name__, self.rate, self.burst)
+
+
+def get_bucket(account, region, rate, burst=None):
+    """
+        Returns the token bucket shared by requests to a region with
+        the credentials of an account, creating it on first use
+
+    Args:
+        :account (str): aws profile name or other credential identity
+        :region (str): AWS region code (e.g. us-east-1)
+        :rate (float): requests per second; None disables rate limiting
+        :burst (int): bucket capacity. DEFAULT: rate
+
+    Returns:
+        TokenBucket, or None if rate is None
+    """
+    if rate is None:
+        return None
+    with _lock:
+        key = (account, region)
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(rate, burst)
+        return _buckets[key]
+
+
+def clear_buckets():
+    """Discards all token buckets"""
+    with _lock:
+        _buckets.clear()
+
+
+def throttled(e):
+    """True if the exception is an AWS throttling error"""
+    return isinstance(e, ClientError) and e.response.get('Error', {}).get('Code') in throttle_codes
+
+
+def retryable(e):
+    """True if the request failing with exception e may succeed when repeated"""
+    if isinstance(e, ClientError):
+        code = e.response.get('Error', {}).get('Code')
+        return code in throttle_codes or code in transient_codes
+    return isinstance(e, (ConnectionError, ReadTimeoutError))
+
+
+def backoff(attempt, base=0.5, cap=20.0):
+    """
+        Delay before retry attempt (0, 1, ...): a random duration between
+        zero and base * 2 ** attempt seconds, at most cap seconds
+
+    Returns:
+        seconds, TYPE: float
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
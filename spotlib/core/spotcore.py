@@ -24,11 +24,23 @@
 
 """
 
+import time
 import inspect
+import datetime
+import functools
+import itertools
 import boto3
 from botocore.exceptions import ClientError
 from spotlib.core import DurationEndpoints
-from spotlib.core.utc import utc_conversion
+from spotlib.core.columnar import to_recordbatch, CategoryTable, SpotPriceRecord, SpotPriceColumns
+from spotlib.core.clients import get_client
+from spotlib.core.concurrency import merge_iterables
+from spotlib.core.endpoints import shard_windows
+from spotlib.core.utc import format_timestamps, as_utc
+from spotlib.core.watermarks import Watermark, WatermarkStore
+from spotlib.core.checkpoint import Checkpoint, CheckpointPage, resume_token
+from spotlib.core.ratelimit import get_bucket, retryable, throttled, backoff
+from spotlib.core.metrics import metrics
 from spotlib.lambda_utils import get_regions
 from spotlib.core import session_selector
 from spotlib import logger
@@ -40,22 +52,43 @@ class EC2SpotPrices():
     number of spot price history data dict
 
     Methods:
+        :session (property): authenticated boto3 session, created on first use
+        :regions (property): AWS region codes, discovered on first use
+        :warmup (user callable): authenticates, discovers regions and creates clients up front
         :set_endpoints (user callable): sets start, end date times for which to request price data
+        :_incremental_endpoints: endpoints of incremental runs ending at the current utc time
+        :_request_filters: assembles server-side filter parameters for spot price requests
+        :filter_regions (user callable): regions in which price data matching the filters can exist
         :_page_iterators: instantiates, constructs a page iterator object
         :_region_paginators (generator): creates regional paginators; one unique per region
+        :_region_pages (generator): iterates one regional paginator, page by page
+        :_shard_pages (generator): pages of one time window shard, deduplicated at its boundaries
+        :_region_stream: pages of one region, sharded by time window if shards > 1
+        :_incremental_pages (generator): drops previously retrieved data, advances watermarks
+        :_checkpoint_pages (generator): records pagination state of consumed pages
+        :_page_generator (generator): merges regional pages, concurrently if workers > 1
         :_spotprice_generator (generator): which uses paginators to request spot price data
         :generate_pricedata (generator, user callable): rollup method for access all child methods
+        :stream_pricedata (generator, user callable): constant memory access to price data by
+            record or by page
+        :generate_recordbatches (generator, user callable): price data as Arrow RecordBatches
 
     Use:
         >>>  from spotlib import SpotPrices
         >>>  sp = SpotPrices(page_size=1000)
         >>>  prices = sp.generate_pricedata('us-east-1')
+        >>>  for price_dict in sp.stream_pricedata(['us-east-1']):
+        ...      print(price_dict['SpotPrice'])
 
     Returns:
         spot price data (generator)
 
     """
-    def __init__(self, profile=None, start_dt=None, end_dt=None, page_size=500, dt_strings=False, debug=False):
+    def __init__(self, profile=None, start_dt=None, end_dt=None, page_size=500, dt_strings=False,
+                 workers=1, shards=1, instance_types=None, product_descriptions=None,
+                 availability_zone=None, filters=None, max_pool_connections=None,
+                 verify_credentials=True, incremental=False, watermarks=None, checkpoint=None,
+                 rate_limit=20, max_retries=8, endpoint_url=None, debug=False):
         """
         Args:
             :profile (str): iam identity with appropriate permissions for spot price functionality
@@ -63,17 +96,122 @@ def __init__(self, profile=None, start_dt=None, end_dt=None, page_size=500, dt_s
             :end_dt (datetime): DateTime object marking data collection stop
             :page_size (int):  Number of spot price elements per pagesize
             :dt_strings (bool): if True, return spot price data with isoformat datetime strings
+            :workers (int): number of regions fetched concurrently. DEFAULT: 1 (sequential)
+            :shards (int): number of time window sub-divisions of each region paginated
+                concurrently. DEFAULT: 1 (single window per region)
+            :instance_types (list): restrict price data to EC2 instance types (e.g. m5.large)
+            :product_descriptions (list): restrict price data to product descriptions
+                (e.g. Linux/UNIX, Windows)
+            :availability_zone (str): restrict price data to one availability zone (e.g. us-east-1a)
+            :filters (list): additional describe_spot_price_history filters, of form
+                [{'Name': 'spot-price', 'Values': ['0.05']}]
+            :max_pool_connections (int): size of the https connection pool of each
+                regional client. DEFAULT: max(10, shards)
+            :verify_credentials (bool): False skips the sts verification of
+                credentials; requests fail later if they are invalid. DEFAULT: True
+            :incremental (bool): retrieve only price data newer than that retrieved
+                by previous runs, tracked per region and filter set. If end_dt is not
+                given, the period ends at the current time. DEFAULT: False
+            :watermarks (str): path of the incremental watermark file.
+                DEFAULT: ~/.config/spotlib/watermarks.json
+            :checkpoint (str): path of a checkpoint file recording the pagination
+                state of each region and time window as pages are consumed.  A
+                retrieval interrupted by an error resumes from the last page
+                consumed when repeated with the same file and time window;
+                incremental runs ending at the current time do not resume
+                (see Checkpoint.key). DEFAULT: None
+            :rate_limit (float): maximum requests per second to each region, shared
+                by all threads using the same profile; halved while AWS throttles
+                requests. None disables rate limiting. DEFAULT: 20
+            :max_retries (int): attempts to repeat a throttled or failed page request,
+                with exponential backoff, before retrieval of a time window is
+                abandoned.  botocore does not retry requests itself unless both
+                rate_limit and max_retries are disabled. DEFAULT: 8
+            :endpoint_url (str): url of an alternative EC2 endpoint serving all
+                regions, such as spotlib.mock.server. DEFAULT: None (AWS)
             :debug (bool): debug output toggle
         """
         self.profile = profile
-        self.session = session_selector(profile)
-        self.regions = get_regions() if profile is None else get_regions(profile)
+        self.verify_credentials = verify_credentials
+        self._session = None            # materialized on first use; see session
+        self._regions = None            # materialized on first use; see regions
+        self.incremental = incremental
         self.start, self.end = self.set_endpoints(start_dt, end_dt)
         self.page_size = page_size
         self.pageconfig = {'PageSize': self.page_size}
         self.dt_strings = dt_strings
+        self.workers = workers
+        self.shards = shards
+        self.instance_types = instance_types
+        self.product_descriptions = product_descriptions
+        self.availability_zone = availability_zone
+        self.filters = filters
+        self.max_pool_connections = max_pool_connections or max(10, shards)
+        self.categories = CategoryTable()
+        self.watermarks = (WatermarkStore(watermarks) if watermarks else WatermarkStore()) if incremental else None
+        self.checkpoint = Checkpoint(checkpoint) if checkpoint else None
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        self.endpoint_url = endpoint_url
         self.debug = debug
 
+    @property
+    def session(self):
+        """Authenticated boto3 session, created on first access"""
+        if self._session is None:
+            self._session = session_selector(self.profile, verify=self.verify_credentials)
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    @property
+    def regions(self):
+        """AWS region codes, discovered (or read from cache) on first access"""
+        if self._regions is None and self.endpoint_url:
+            client = get_client(self.session, 'ec2', self.session.region_name or 'us-east-1',
+                                self.max_pool_connections, self.endpoint_url)
+            with metrics.timer('regions'):
+                self._regions = [x['RegionName'] for x in client.describe_regions()['Regions']]
+        elif self._regions is None:
+            with metrics.timer('regions'):
+                self._regions = get_regions(self.profile, session=self._session)
+        return self._regions
+
+    @regions.setter
+    def regions(self, regions):
+        self._regions = list(regions)
+
+    def warmup(self, regions=None):
+        """
+            Materializes the session, region list and regional clients
+            which are otherwise created on first use, moving their
+            latency out of the first price data request
+
+        Args:
+            :regions (list): AWS region codes for which clients are created,
+                DEFAULT: all regions
+
+        Returns:
+            self, TYPE: EC2SpotPrices
+        """
+        for region in (self.regions if regions is None else regions):
+            self._client(region)
+        return self
+
+    def _client(self, region):
+        """
+            Cached ec2 client of a region.  While spotlib rate limits or
+            retries page requests, botocore's own retries are disabled so
+            that every http request takes a token from the region's bucket
+            and max_retries bounds the attempts made.
+        """
+        max_attempts = 0 if self.rate_limit or self.max_retries else None
+        return get_client(
+            self.session, 'ec2', region, self.max_pool_connections, self.endpoint_url, max_attempts
+        )
+
     def __str__(self):
         return self.__repr__()
 
@@ -82,14 +220,19 @@ def __repr__(self):
 
     def set_endpoints(self, start_dt=None, end_dt=None, duration=None):
         """
-        Rationalize start and end datetimes for data history lookup
+        Rationalize start and end datetimes for data history lookup.
+        Incremental retrieval ends at the current time unless end_dt
+        is given.
         """
         self.de = DurationEndpoints()
 
+        if self.incremental and end_dt is None:
+            start_dt, end_dt = self._incremental_endpoints(start_dt, duration)
+
         if all(x is None for x in [start_dt, end_dt, duration]):
             return self.de.start, self.de.end
 
-        elif duration and start_dt is None:
+        if duration and start_dt is None:
             s, e = self.de.default_endpoints(duration_days=duration)
 
         elif start_dt and end_dt:
@@ -97,16 +240,71 @@ def set_endpoints(self, start_dt=None, end_dt=None, duration=None):
         self.start, self.end = s, e    # reset instance variable statics
         return s, e
 
-    def _page_iterators(self, region):
-        self.client = self.session.client('ec2', region_name=region)
-        self.paginator = self.client.get_paginator('describe_spot_price_history')
-        self.page_iterator = self.paginator.paginate(
-                                StartTime=self.start,
-                                EndTime=self.end,
-                                DryRun=self.debug,
-                                PaginationConfig={'PageSize': self.page_size}
-                            )
-        return self.page_iterator
+    def _incremental_endpoints(self, start_dt=None, duration=None):
+        """
+        Endpoints of an incremental run given no end_dt.  The run ends at the
+        current utc time; without start_dt it begins duration days earlier,
+        or at the default start.  Datetimes returned are timezone aware.
+        """
+        end = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+
+        if start_dt is None:
+            start_dt = end - datetime.timedelta(days=duration) if duration else self.de.start
+        if isinstance(start_dt, datetime.datetime):
+            start_dt = as_utc(start_dt)
+        return start_dt, end
+
+    def _request_filters(self, instance_types=None, product_descriptions=None,
+                         availability_zone=None, filters=None):
+        """
+        Assembles server-side filter parameters for describe_spot_price_history.
+        Parameters given override those set on the instance; parameters
+        which are unset on both are omitted from the request.
+
+        Returns:
+            request parameters, TYPE: dict
+        """
+        params = {
+            'InstanceTypes': instance_types if instance_types is not None else self.instance_types,
+            'ProductDescriptions': (
+                product_descriptions if product_descriptions is not None else self.product_descriptions),
+            'AvailabilityZone': availability_zone if availability_zone is not None else self.availability_zone,
+            'Filters': filters if filters is not None else self.filters
+        }
+        return {k: v for k, v in params.items() if v}
+
+    def filter_regions(self, regions, params=None):
+        """
+        Regions in which price data matching the filters given can exist.
+        An availability zone exists in only one region; all other regions
+        are skipped when the AvailabilityZone filter is set.
+
+        Args:
+            :regions (list): AWS region codes
+            :params (dict): server-side filters; see _request_filters
+
+        Returns:
+            AWS region codes, TYPE: list
+        """
+        params = self._request_filters() if params is None else params
+        if 'AvailabilityZone' not in params:
+            return list(regions)
+        return [x for x in regions if params['AvailabilityZone'].startswith(x)]
+
+    def _page_iterators(self, region, start=None, end=None, params=None, token=None):
+        pagination = {'PageSize': self.page_size}
+        if token is not None:
+            pagination['StartingToken'] = token
+
+        # nothing is stored on the instance; worker threads restart iterators concurrently
+        paginator = self._client(region).get_paginator('describe_spot_price_history')
+        return paginator.paginate(
+                    StartTime=start or self.start,
+                    EndTime=end or self.end,
+                    DryRun=self.debug,
+                    PaginationConfig=pagination,
+                    **(self._request_filters() if params is None else params)
+                )
 
     def _region_paginators(self, regions):
         """
@@ -114,6 +312,284 @@ def _region_paginators(self, regions):
         """
         return [self._page_iterators(region) for region in regions]
 
+    def _region_pages(self, region, page_iterator, status=None, key=None, restart=None):
+        """
+        Iterates the paginator of a single region, yielding the list of
+        spot price dicts contained in each page returned by AWS.  Page
+        requests are rate limited per region; a throttled or failed page
+        request is repeated after a backoff delay by restarting pagination
+        at the page which failed.
+
+        Args:
+            :region (str): AWS region code of the paginator. Example: us-east-1
+            :page_iterator (PageIterator): paginator created by _page_iterators
+            :status (dict): if given, status['failed'] is set True when
+                retrieval ends early due to an exception
+            :key (str): checkpoint key of the window; pages are returned as
+                CheckpointPages carrying their pagination state
+            :restart (callable): returns a paginator of the same window given
+                the NextToken of the next page to request; None disables retry
+
+        Returns:
+            spot price data pages (generator)
+        """
+        fx = inspect.stack()[0][3]
+        bucket = get_bucket(self.profile, region, self.rate_limit)
+        pages, token, attempt = iter(page_iterator), None, 0
+
+        while True:
+            try:
+                if bucket is not None:
+                    bucket.acquire()
+                with metrics.timer('fetch', region):
+                    page = next(pages)
+
+            except StopIteration:
+                return
+
+            except Exception as e:
+                if throttled(e):
+                    metrics.count('throttles', 1, region)
+                    if bucket is not None:
+                        bucket.throttled()
+
+                if restart is not None and retryable(e) and attempt < self.max_retries:
+                    delay = backoff(attempt)
+                    attempt += 1
+                    metrics.count('retries', 1, region)
+                    logger.warning(
+                        f'{fx}: Retry {attempt} of {self.max_retries} in {delay:.2f}s of spot data '
+                        f'request in region {region}: {e}')
+                    time.sleep(delay)
+                    pages = iter(restart(token))
+                    continue
+
+                if isinstance(e, ClientError):
+                    logger.exception(
+                        f'{fx}: Boto client error while downloading spot data in region {region}: {e}')
+                else:
+                    logger.exception(f'{fx}: Unknown exception during spot data retrieval region {region}: {e}')
+                if status is not None:
+                    status['failed'] = True
+                return
+
+            attempt = 0
+            if bucket is not None:
+                bucket.success()
+            if metrics.enabled:
+                # retries made by botocore itself (rate_limit and max_retries disabled)
+                meta = page.get('ResponseMetadata', {})
+                metrics.count('pages', 1, region)
+                metrics.count('records', len(page['SpotPriceHistory']), region)
+                metrics.count('bytes', int(meta.get('HTTPHeaders', {}).get('content-length') or 0), region)
+                metrics.count('retries', meta.get('RetryAttempts', 0), region)
+
+            token = page.get('NextToken')
+            if key is None:
+                yield page['SpotPriceHistory']
+            else:
+                records = page['SpotPriceHistory']
+                yield CheckpointPage(records, (key, token, len(records)))
+            if not token:
+                return          # last page; the exhausted paginator needs no token
+
+    def _restart_iterator(self, region, start, end, params, token, next_token):
+        """
+        Paginator of a time window resuming at the page of next_token, or
+        at the starting token of the window if no page has been received
+        """
+        return self._page_iterators(region, start, end, params, resume_token(next_token) or token)
+
+    def _shard_pages(self, region, page_iterator, start, end, first=False, last=False, status=None,
+                     key=None, restart=None):
+        """
+        Pages of a single time window shard of a region.  AWS returns the
+        price in effect at StartTime as well as the prices set inside the
+        window, so adjacent shards overlap.  Each record is kept only by
+        the shard which owns its Timestamp, ie start <= Timestamp < end;
+        the first shard also keeps records prior to its start and the last
+        shard those at or after its end.
+
+        Args:
+            :region (str): AWS region code. Example: us-east-1
+            :page_iterator (PageIterator): paginator for the shard window
+            :start (datetime): start of the shard window
+            :end (datetime): end of the shard window
+            :first (bool): True if the shard is the earliest window
+            :last (bool): True if the shard is the latest window
+            :status (dict): see _region_pages
+            :key (str): see _region_pages
+            :restart (callable): see _region_pages
+
+        Returns:
+            spot price data pages (generator)
+        """
+        lo, hi = as_utc(start), as_utc(end)
+
+        for page in self._region_pages(region, page_iterator, status, key, restart):
+            yield CheckpointPage.derive(page, [
+                x for x in page
+                if (first or x['Timestamp'] >= lo) and (last or x['Timestamp'] < hi)
+            ])
+
+    def fetch_window(self, region, params=None):
+        """
+        Time window retrieved for a region: [start, end], or for incremental
+        retrieval [watermark, end] once a previous run has recorded one
+
+        Args:
+            :region (str): AWS region code. Example: us-east-1
+            :params (dict): server-side filters; see _request_filters
+
+        Returns:
+            start (datetime), end (datetime), watermark (Watermark | None), TYPE: tuple
+        """
+        params = self._request_filters() if params is None else params
+        start, end = as_utc(self.start), as_utc(self.end)
+        watermark = self.watermarks.get(region, params) if self.incremental else None
+
+        if watermark is not None:
+            # the price in effect at the watermark is returned again; see _incremental_pages
+            start = max(start, watermark.timestamp)
+        return start, end, watermark
+
+    def _region_stream(self, region, params=None):
+        """
+        Supplies the pages of a single region.  When shards > 1, the time
+        period [start, end] is split into equal sub-windows, each paginated
+        concurrently and merged into a single stream of pages.
+
+        Args:
+            :region (str): AWS region code. Example: us-east-1
+            :params (dict): server-side filters; see _request_filters
+
+        Returns:
+            spot price data pages (iterable)
+        """
+        params = self._request_filters() if params is None else params
+        start, end, watermark = self.fetch_window(region, params)
+        status = {}
+        if start >= end:
+            return iter([])
+
+        windows = [(start, end)] if self.shards <= 1 else shard_windows(start, end, self.shards)
+        streams = []
+
+        for index, (s, e) in enumerate(windows):
+            key, token = None, None
+
+            if self.checkpoint is not None:
+                key = Checkpoint.key(region, s, e, params)
+                if self.checkpoint.register(key, region, s, e)['done']:
+                    logger.info('Skipping window %s - %s of region %s: retrieved by previous run' % (s, e, region))
+                    continue
+                token = self.checkpoint.starting_token(key)
+
+            page_iterator = self._page_iterators(region, s, e, params, token)
+            restart = functools.partial(self._restart_iterator, region, s, e, params, token)
+
+            if len(windows) == 1:
+                streams.append(self._region_pages(region, page_iterator, status, key, restart))
+            else:
+                streams.append(self._shard_pages(
+                    region, page_iterator, s, e, first=(index == 0),
+                    last=(index == len(windows) - 1), status=status, key=key, restart=restart
+                ))
+
+        if not streams:
+            return iter([])
+        stream = streams[0] if len(streams) == 1 else merge_iterables(streams, workers=len(streams))
+
+        if self.incremental:
+            return self._incremental_pages(region, stream, params, watermark, status)
+        return stream
+
+    def _incremental_pages(self, region, stream, params, watermark, status):
+        """
+        Filters the pages of a region to price data not retrieved by a
+        previous run and, once the region is retrieved without error,
+        persists the latest Timestamp seen as the region's new watermark
+
+        Args:
+            :region (str): AWS region code. Example: us-east-1
+            :stream (iterable): pages of the region
+            :params (dict): server-side filters; part of the watermark key
+            :watermark (Watermark): watermark of the previous run, or None
+            :status (dict): see _region_pages
+
+        Returns:
+            spot price data pages (generator)
+        """
+        latest = Watermark(watermark.timestamp, watermark.keys) if watermark else None
+
+        for page in stream:
+            if watermark is not None:
+                page = CheckpointPage.derive(page, [x for x in page if watermark.is_new(x)])
+            for price_dict in page:
+                if latest is None:
+                    latest = Watermark(price_dict['Timestamp'])
+                latest.advance(price_dict)
+            yield page
+
+        if not status.get('failed'):
+            self.watermarks.update(region, params, latest)
+
+    def _checkpoint_pages(self, stream, flush=None):
+        """
+        Records the pagination state of each page in the checkpoint file
+        once the consumer requests the following page.  Runs in the
+        calling thread, so pages queued by concurrent workers but not yet
+        consumed are never recorded.
+
+        Args:
+            :stream (iterable): CheckpointPages of one or more regions
+            :flush (callable): called before the state of a page is recorded,
+                so that a resumed run never skips a page its consumer had
+                buffered but not yet written.  An integer returned is recorded
+                as the byte offset of the output file (see Checkpoint.offset)
+
+        Returns:
+            spot price data pages (generator)
+        """
+        for page in stream:
+            yield page
+            state = getattr(page, 'state', None)
+            if state is not None:
+                offset = flush() if flush is not None else None
+                self.checkpoint.advance(*state, offset=offset)
+
+    def _page_generator(self, regions, params=None, flush=None):
+        """
+        Supplies pages of spot price data for all regions given.  When
+        workers > 1, regional paginators run concurrently and pages are
+        merged into a single stream in order of arrival.
+
+        Args:
+            :regions (list): AWS region codes
+            :params (dict): server-side filters; see _request_filters
+            :flush (callable): see _checkpoint_pages
+
+        Returns:
+            spot price data pages (generator)
+        """
+        params = self._request_filters() if params is None else params
+
+        queried = self.filter_regions(regions, params)
+        if len(queried) < len(regions):
+            logger.info(
+                'Skipping regions without availability zone %s: %s' %
+                (params['AvailabilityZone'], ', '.join(x for x in regions if x not in queried)))
+        regions = queried
+
+        # paginators are created here, in the calling thread, as boto3
+        # sessions are not safe to share between threads
+        streams = [self._region_stream(region, params) for region in regions]
+        if self.workers > 1 and len(streams) > 1:
+            stream = merge_iterables(streams, workers=self.workers)
+        else:
+            stream = itertools.chain.from_iterable(streams)
+        return stream if self.checkpoint is None else self._checkpoint_pages(stream, flush)
+
     def _spotprice_generator(self, region=None, dt_string=False):
         """
         Generator returning up to 1000 data items per api request to AWS
@@ -126,26 +602,31 @@ def _spotprice_generator(self, region=None, dt_string=False):
         Returns:
             spot price data (generator)
         """
-        strings = dt_string or self.dt_strings
-        rgn = region if region is not None else 'unknown'
+        return self._price_generator(self.regions if region is None else [region], dt_string)
 
-        for page_iterator in (self._region_paginators(self.regions) if region is None else self._region_paginators([region])):
-            try:
+    def _price_generator(self, regions, dt_string=False, params=None, flush=None):
+        """
+        Flattens pages supplied by _page_generator into individual
+        spot price dicts for one or more regions
+
+        Args:
+            :regions (list): AWS region codes
+            :dt_string (bool): indicates TYPE for datetime values
+                returned in spotprice data.
+            :params (dict): server-side filters; see _request_filters
+            :flush (callable): see _checkpoint_pages
 
-                for page in page_iterator:
-                    for price_dict in page['SpotPriceHistory']:
-                        yield utc_conversion(price_dict) if strings else price_dict
+        Returns:
+            spot price data (generator)
+        """
+        strings = dt_string or self.dt_strings
 
-            except ClientError as e:
-                fx = inspect.stack()[0][3]
-                logger.exception(
-                    f'{fx}: Boto client error while downloading spot data in region {rgn}: {e}')
-                continue
-            except Exception as e:
-                fx = inspect.stack()[0][3]
-                logger.exception(f'{fx}: Unknown exception during spot data retrieval region {rgn}: {e}')
+        for page in self._page_generator(regions, params, flush):
+            yield from format_timestamps(page) if strings else page
 
-    def generate_pricedata(self, regions, dtstrings=False):
+    def generate_pricedata(self, regions, dtstrings=False, instance_types=None,
+                           product_descriptions=None, availability_zone=None, filters=None,
+                           compact=False):
         """
             Rollup facility for ease generation of regional spot price data.
             Iterates child paginator and generator methods to retrieve spot prices.
@@ -153,17 +634,31 @@ def generate_pricedata(self, regions, dtstrings=False):
         Args:
             :regions (list): list of AWS region codes (e.g. us-east-1)
             :dtstrings (bool): True returns datetime in str format, DEFAULT: False
+            :instance_types (list): restrict to EC2 instance types, DEFAULT: all
+            :product_descriptions (list): restrict to product descriptions, DEFAULT: all
+            :availability_zone (str): restrict to a single availability zone, DEFAULT: all
+            :filters (list): additional describe_spot_price_history filters
+            :compact (bool): True returns price data as a SpotPriceColumns
+                column store instead of a list of dicts, DEFAULT: False
 
         Returns:
             - Spot price data for specific AWS region code
               specified (e.q. region = us-east-1)
+            - when compact, also the CategoryTable shared by all calls
+              on this instance mapping categorical fields to int codes:
+              {'SpotPriceHistory': SpotPriceColumns, 'Categories': CategoryTable}
         """
-        container = []
-        for region in regions:
-            container.extend([x for x in self._spotprice_generator(region, dtstrings)])
-        return {'SpotPriceHistory': container}
-
-    def generate_allregion_pricedata(self, dtstrings=False):
+        params = self._request_filters(
+            instance_types, product_descriptions, availability_zone, filters
+        )
+        if compact:
+            container = SpotPriceColumns(categories=self.categories)
+            for page in self._page_generator(regions, params):
+                container.extend(page)
+            return {'SpotPriceHistory': container, 'Categories': self.categories}
+        return {'SpotPriceHistory': [x for x in self._price_generator(regions, dtstrings, params)]}
+
+    def generate_allregion_pricedata(self, dtstrings=False, compact=False):
         """
             Rollup facility for ease generation of spot price data from all AWS
             regions. Automates iternation of child paginator and generator methods
@@ -171,8 +666,96 @@ def generate_allregion_pricedata(self, dtstrings=False):
 
         Args:
             :dtstrings (bool): True returns datetime in str format, DEFAULT: False
+            :compact (bool): True returns price data as a SpotPriceColumns
+                column store instead of a list of dicts, DEFAULT: False
 
         Returns:
             - Spot price data for all AWS region codes (e.q. us-east-1)
         """
+        if compact:
+            return self.generate_pricedata(self.regions, compact=True)
         return {'SpotPriceHistory': [x for x in self._spotprice_generator(None, dtstrings)]}
+
+    def stream_pricedata(self, regions=None, dtstrings=False, pages=False, instance_types=None,
+                         product_descriptions=None, availability_zone=None, filters=None,
+                         compact=False, flush=None):
+        """
+            Streaming counterpart to generate_pricedata.  Price data is yielded
+            as it is received from AWS rather than accumulated, so memory use
+            is bounded by the page size regardless of the duration or number
+            of regions requested.
+
+        Args:
+            :regions (list): list of AWS region codes (e.g. us-east-1), DEFAULT: all regions
+            :dtstrings (bool): True returns datetime in str format, DEFAULT: False
+            :pages (bool): True yields one list of spot price dicts per api
+                page instead of individual spot price dicts, DEFAULT: False
+            :instance_types (list): restrict to EC2 instance types, DEFAULT: all
+            :product_descriptions (list): restrict to product descriptions, DEFAULT: all
+            :availability_zone (str): restrict to a single availability zone, DEFAULT: all
+            :filters (list): additional describe_spot_price_history filters
+            :compact (bool): True yields SpotPriceRecords in place of spot price
+                dicts; dtstrings is ignored. DEFAULT: False
+            :flush (callable): with a checkpoint, called once each page is
+                consumed and before its pagination state is recorded; pass the
+                flush method of the writer the pages are written to. DEFAULT: None
+
+        Returns:
+            spot price dicts or pages of spot price dicts (generator)
+        """
+        regions = self.regions if regions is None else regions
+        params = self._request_filters(
+            instance_types, product_descriptions, availability_zone, filters
+        )
+
+        if compact:
+            for page in self._page_generator(regions, params, flush):
+                records = [SpotPriceRecord.from_dict(x) for x in page]
+                if pages:
+                    yield records
+                else:
+                    yield from records
+            return
+
+        if not pages:
+            yield from self._price_generator(regions, dtstrings, params, flush)
+            return
+
+        strings = dtstrings or self.dt_strings
+
+        for page in self._page_generator(regions, params, flush):
+            yield format_timestamps(page) if strings else page
+
+    def generate_recordbatches(self, regions=None, batch_size=100000, instance_types=None,
+                               product_descriptions=None, availability_zone=None, filters=None):
+        """
+            Streams price data as Apache Arrow RecordBatches of up to
+            batch_size rows.  Categorical columns are dictionary encoded,
+            SpotPrice is float64 and Timestamp is timestamp[s, UTC].
+            Requires the optional pyarrow package.
+
+        Args:
+            :regions (list): list of AWS region codes (e.g. us-east-1), DEFAULT: all regions
+            :batch_size (int): maximum number of rows per RecordBatch
+            :instance_types (list): restrict to EC2 instance types, DEFAULT: all
+            :product_descriptions (list): restrict to product descriptions, DEFAULT: all
+            :availability_zone (str): restrict to a single availability zone, DEFAULT: all
+            :filters (list): additional describe_spot_price_history filters
+
+        Returns:
+            pyarrow.RecordBatch (generator)
+        """
+        regions = self.regions if regions is None else regions
+        params = self._request_filters(
+            instance_types, product_descriptions, availability_zone, filters
+        )
+        buffer = []
+
+        for page in self._page_generator(regions, params):
+            buffer.extend(page)
+            while len(buffer) >= batch_size:
+                yield to_recordbatch(buffer[:batch_size])
+                buffer = buffer[batch_size:]
+
+        if buffer:
+            yield to_recordbatch(buffer)
@@ -0,0 +1,128 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Class:  WatermarkStore
+        - persists, per region and set of request filters, the
+          latest spot price Timestamp already retrieved, enabling
+          incremental retrieval of only new price data.
+
+"""
+import os
+import json
+import hashlib
+import inspect
+import datetime
+import threading
+from spotlib import logger
+from spotlib.statics import watermark_path
+
+
+def record_key(price_dict):
+    """Identity of a spot price series: (AvailabilityZone, InstanceType, ProductDescription)"""
+    return (price_dict['AvailabilityZone'], price_dict['InstanceType'], price_dict['ProductDescription'])
+
+
+class Watermark():
+    """
+    Latest Timestamp retrieved for a region and filter set, plus the
+    series whose price changed at exactly that Timestamp.  Records at
+    the watermark Timestamp are only new if their series is not listed.
+    """
+    def __init__(self, timestamp, keys=None):
+        """
+        Args:
+            :timestamp (datetime): timezone aware utc Timestamp
+            :keys (set): record_key tuples of records at timestamp
+        """
+        self.timestamp = timestamp
+        self.keys = set(keys or [])
+
+    def is_new(self, price_dict):
+        """True if the spot price dict was not retrieved before"""
+        ts = price_dict['Timestamp']
+        return ts > self.timestamp or (ts == self.timestamp and record_key(price_dict) not in self.keys)
+
+    def advance(self, price_dict):
+        """Raises the watermark to include the spot price dict"""
+        ts = price_dict['Timestamp']
+        if ts > self.timestamp:
+            self.timestamp, self.keys = ts, {record_key(price_dict)}
+        elif ts == self.timestamp:
+            self.keys.add(record_key(price_dict))
+
+    def __repr__(self):
+        return '{}(timestamp={}, keys={})'.format(self.__class__.__name__, self.timestamp, len(self.keys))
+
+
+class WatermarkStore():
+    """
+    Json file of watermarks keyed by region and request filters.
+
+    Use:
+        >>>  store = WatermarkStore()
+        >>>  wm = store.get('us-east-1', {'InstanceTypes': ['m5.large']})
+    """
+    def __init__(self, path=watermark_path):
+        """
+        Args:
+            :path (str): location of the json file. DEFAULT: ~/.config/spotlib/watermarks.json
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.marks = self._load()
+
+    @staticmethod
+    def key(region, params=None):
+        """Store key of a region and describe_spot_price_history filter parameters"""
+        digest = hashlib.sha1(json.dumps(params or {}, sort_keys=True).encode('utf-8')).hexdigest()
+        return '{}:{}'.format(region, digest[:16])
+
+    def get(self, region, params=None):
+        """
+            Watermark of a region and filter set
+
+        Returns:
+            Watermark, or None if no price data was retrieved before
+        """
+        with self.lock:
+            entry = self.marks.get(self.key(region, params))
+        if entry is None:
+            return None
+        ts = datetime.datetime.fromtimestamp(entry['timestamp'], tz=datetime.timezone.utc)
+        return Watermark(ts, [tuple(x) for x in entry['keys']])
+
+    def update(self, region, params, watermark):
+        """Persists the watermark of a region and filter set"""
+        if watermark is None:
+            return
+        with self.lock:
+            self.marks[self.key(region, params)] = {
+                'region': region,
+                'timestamp': int(watermark.timestamp.timestamp()),
+                'keys': sorted(list(x) for x in watermark.keys)
+            }
+            self._save()
+
+    def _load(self):
+        try:
+            with open(self.path) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning('%s: unable to read watermarks %s: %s' % (inspect.stack()[0][3], self.path, e))
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as handle:
+                json.dump(self.marks, handle, indent=4)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.exception('%s: unable to persist watermarks %s: %s' % (inspect.stack()[0][3], self.path, e))
@@ -46,12 +46,45 @@
                        [-s, --start  <value>  ]
                        [-e, --end    <value>  ]
                        [-d, --duration-days   <value>  ]
+                       [--endpoint-url <value>  ]
+                       [-f, --format   <value>  ]
+                       [-c, --compress <value>  ]
+                       [--checkpoint   <value>  ]
+                       [--database     <value>  ]
                        [-p, --profile  <value>  ]
+                       [--profile-cpu  <value>  ]
+                       [--profile-mem [<value>] ]
+                       [-i, --instance-types <value> ...]
+                       [--incremental  ]
+                       [--metrics      <value>  ]
+                       [-o, --os       <value> ...]
+                       [--az           <value>  ]
+                       [--shards       <value>  ]
+                       [--stream       ]
                        [-d, --debug    ]
                        [-h, --help     ]
                        [-V, --version  ]
     """ + bdwt + """
   OPTIONS
+    """ + bdwt + """
+        -c, --compress""" + rst + """ <value>:  Compress output files while they are
+            written, one of: gzip, xz, or zstd (requires zstandard package).
+            Parquet output supports gzip and zstd column compression.
+    """ + bdwt + """
+        --checkpoint""" + rst + """ <value>:  Record retrieval progress in file <value>.
+            Repeating an interrupted run with the same file skips regions
+            already written and resumes ndjson and sqlite output after the
+            last page written; other formats restart incomplete regions.
+            Runs with --incremental and no --end restart incomplete regions,
+            as each run ends at a different time.  The file is removed once
+            all regions are written.
+    """ + bdwt + """
+        --database""" + rst + """ <value>:  Path of the database to which --format
+            sqlite adds the price data of all regions, default
+            spotprices.sqlite in the current directory.
+    """ + bdwt + """
+        --az""" + rst + """ <value>:  Restrict price data to a single availability
+            zone (example: us-east-1a).
     """ + bdwt + """
         -D, --duration-days""" + rst + """ <value>: Number of days of price data
             history to retrieve ending at midnight on present day.
@@ -63,14 +96,58 @@
     """ + bdwt + """
         -e, --end""" + rst + """ <value>:  Datetime of end of the price sampling
             period (example: 2019-09-04T23:59:59). See --start.
+    """ + bdwt + """
+        --endpoint-url""" + rst + """ <value>:  Send EC2 requests to <value>
+            instead of AWS, such as a local mock server started with
+            python -m spotlib.mock.server.  Credentials are not verified.
+    """ + bdwt + """
+        -f, --format""" + rst + """ <value>:  Output file format, one of: json
+            (default), ndjson (JSON Lines, one record per line), parquet
+            (requires pyarrow package), or sqlite (one indexed database for
+            all regions, see --database; records already present are
+            skipped). Formats other than json are always streamed to the
+            local filesystem.
     """ + bdwt + """
         -h, --help""" + rst + """: Show this help message, symbol legend, & exit
+    """ + bdwt + """
+        -i, --instance-types""" + rst + """ <value>:  Restrict price data to one or
+            more EC2 instance types (example: m5.large c5.xlarge).
+    """ + bdwt + """
+        --incremental""" + rst + """:  Retrieve only price data newer than that
+            retrieved by previous runs with the same region and filters.
+            Watermarks are kept in ~/.config/spotlib/watermarks.json.
+    """ + bdwt + """
+        --metrics""" + rst + """ <value>:  Record time spent authenticating,
+            discovering regions, requesting pages, converting timestamps
+            and writing files, with page, record, byte, retry and throttle
+            counts per region, to file <value>: Prometheus text if <value>
+            ends with .prom, json otherwise.
+    """ + bdwt + """
+        -o, --os""" + rst + """ <value>:  Restrict price data to one or more product
+            descriptions (example: Linux/UNIX "Red Hat Enterprise Linux").
     """ + bdwt + """
         -p, --profile""" + rst + """: Access the AWS api using specified profile
             from the local awscli configuration.
+    """ + bdwt + """
+        --profile-cpu""" + rst + """ <value>:  Profile the run with cProfile.  Writes
+            pstats to <value> and a report of the costliest functions
+            per region and time window to <value>.txt.  Threads started
+            by --shards are not profiled.
+    """ + bdwt + """
+        --profile-mem""" + rst + """ [<value>]:  Trace memory allocations with
+            tracemalloc.  Writes the peak memory and largest allocation
+            growth per region and time window to <value>, default
+            spotcli-memory.txt.  Slows retrieval considerably.
     """ + bdwt + """
         -r, --region""" + rst + """:  AWS region code (e.g. us-east-1) for which
             you wish to retrieve EC2 spot price data.
+    """ + bdwt + """
+        --shards""" + rst + """ <value>:  Split the price sampling period of each
+            region into <value> sub-periods retrieved concurrently.
+    """ + bdwt + """
+        --stream""" + rst + """:  Write price data to the local filesystem as it
+            is received instead of after retrieval of each region completes.
+            Keeps memory use constant for long sampling periods.
     """ + bdwt + """
         -V, --version""" + rst + """: Print version, license, and copyright info
     """
@@ -27,13 +27,19 @@
 import inspect
 import logging
 import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.exceptions import ClientError, ConnectionError, HTTPClientError, NoCredentialsError
 from spotlib.core import session_selector
+from spotlib.core.clients import get_client
+from spotlib.common import open_file
+from spotlib.statics import region_cache_path, region_cache_ttl
 from spotlib._version import __version__
 
 logger = logging.getLogger(__version__)
 logger.setLevel(logging.INFO)
 
+# in-memory region catalog:  profile => {'timestamp': epoch, 'regions': [...]}
+_region_catalog = {}
+
 
 def read_env_variable(arg, default=None, patterns=None):
     """
@@ -131,24 +137,76 @@ def get_account_info(account_profile=None):
     return (number, name)
 
 
-def get_regions(profile=None):
+def _read_region_cache(key, path=region_cache_path):
+    """Region catalog entry from memory, else the local filesystem; None if absent"""
+    if key in _region_catalog:
+        return _region_catalog[key]
+    try:
+        with open(path) as handle:
+            entry = json.load(handle).get(key)
+    except (OSError, ValueError):
+        return None
+    if entry:
+        _region_catalog[key] = entry
+    return entry
+
+
+def _write_region_cache(key, regions, path=region_cache_path):
+    """Stores a region catalog entry in memory and on the local filesystem"""
+    entry = {'timestamp': time.time(), 'regions': regions}
+    _region_catalog[key] = entry
+    try:
+        catalog = {}
+        if os.path.exists(path):
+            with open(path) as handle:
+                catalog = json.load(handle)
+        catalog[key] = entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as handle:
+            json.dump(catalog, handle, indent=4)
+        os.replace(tmp, path)
+    except (OSError, ValueError) as e:
+        logger.info('%s: unable to persist region catalog to %s: %s' % (inspect.stack()[0][3], path, e))
+    return entry
+
+
+def get_regions(profile=None, session=None, refresh=False, ttl=region_cache_ttl):
     """
     Summary
-        Returns list of region codes for all AWS regions worldwide
+        Returns list of region codes for all AWS regions worldwide.
+        Results are cached in memory and on the local filesystem
+        (statics.region_cache_path) for ttl seconds.  When AWS cannot
+        be reached, an expired cached catalog is returned if present.
+        Credentials are not verified with sts beforehand; invalid
+        credentials fail the describe_regions request instead.
+
+    Args:
+        profile (str): awscli profile_name used when no session is given
+        session (boto3.Session): existing authenticated session to reuse;
+            only used when the catalog must be retrieved from AWS
+        refresh (bool): True ignores the cache and queries AWS
+        ttl (int): seconds a cached catalog remains valid
 
     Returns:
         TYPE: list
 
     """
+    key = profile or 'default'
+    cached = _read_region_cache(key)
+
+    if cached and not refresh and time.time() - cached['timestamp'] < ttl:
+        return list(cached['regions'])
+
     try:
 
-        session = session_selector(profile)
-        client = session.client('ec2')
+        session = session or session_selector(profile, verify=False)
+        client = get_client(session, 'ec2')
         response = client.describe_regions()
 
     except ClientError as e:
         if e.response['Error']['Code'] == 'AuthFailure':
-            return ['us-east-1']
+            return list(cached['regions']) if cached else ['us-east-1']
         else:
             logger.critical(
                 "%s: problem retrieving aws regions (Code: %s Message: %s)" %
@@ -156,9 +214,30 @@ def get_regions(profile=None):
                 e.response['Error']['Message']))
             raise e
 
+    except (ConnectionError, HTTPClientError) as e:
+        if cached:
+            logger.warning(
+                '%s: AWS unreachable, using cached region catalog: %s' % (inspect.stack()[0][3], e))
+            return list(cached['regions'])
+        raise e
+
     except NoCredentialsError:
-            return ['us-east-1']
-    return [region['RegionName'] for region in response['Regions']]
+            return list(cached['regions']) if cached else ['us-east-1']
+
+    regions = [region['RegionName'] for region in response['Regions']]
+    _write_region_cache(key, regions)
+    return regions
+
+
+def refresh_regions(profile=None, session=None):
+    """
+    Summary
+        Refreshes the cached region catalog from AWS
+
+    Returns:
+        TYPE: list
+    """
+    return get_regions(profile, session, refresh=True)
 
 
 def sns_notification(topic_arn, subject, message, account_id=None, account_name=None):
@@ -211,7 +290,8 @@ def sns_notification(topic_arn, subject, message, account_id=None, account_name=
 def import_file_object(filename):
     """
 
-    Summary: imports block fs object
+    Summary: imports block fs object; gzip, xz or zstd
+        compressed files are decompressed transparently
 
     Args: block filesystem object
 
@@ -220,7 +300,7 @@ def import_file_object(filename):
 
     """
     try:
-        with open(filename, 'r') as handle:
+        with open_file(filename, 'rt') as handle:
             file_obj = handle.read()
             dict_obj = json.loads(file_obj)
 
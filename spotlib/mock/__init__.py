@@ -0,0 +1,24 @@
+"""
+Local stand-in for the EC2 spot price api and synthetic price
+histories, for offline load testing without AWS credentials.
+"""
+import importlib
+
+
+# imported on first access, so that python -m spotlib.mock.server
+# does not find the server module already loaded
+_exports = {
+    'SyntheticHistory': 'spotlib.mock.synthetic',
+    'MockSpotPriceServer': 'spotlib.mock.server'
+}
+
+
+def __getattr__(name):
+    if name in _exports:
+        globals()[name] = value = getattr(importlib.import_module(_exports[name]), name)
+        return value
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
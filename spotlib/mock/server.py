@@ -0,0 +1,312 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Class:  MockSpotPriceServer
+        - local http stand-in for the EC2 query api serving
+          DescribeSpotPriceHistory and DescribeRegions from a
+          SyntheticHistory, for offline load testing of region
+          fan-out, sharding, pagination and retries.
+        - NextToken pagination limited to max_results per page,
+          injected latency, and RequestLimitExceeded throttling,
+          either at random or above a request rate.
+        - the region of each request is taken from the credential
+          scope of its SigV4 signature; any credentials are accepted.
+
+    Use:
+        >>>  with MockSpotPriceServer(latency=0.05, throttle=0.02) as server:
+        ...      sp = EC2SpotPrices(endpoint_url=server.endpoint_url, verify_credentials=False)
+
+        $ python -m spotlib.mock.server --port 8000 --latency 0.05 --throttle 0.02
+
+"""
+import re
+import sys
+import time
+import uuid
+import random
+import argparse
+import datetime
+import threading
+from xml.sax.saxutils import escape
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from spotlib.core.endpoints import parse_datetime
+from spotlib.mock.synthetic import SyntheticHistory
+
+
+xmlns = 'http://ec2.amazonaws.com/doc/2016-11-15/'
+
+# region of the SigV4 credential scope: Credential=AKID/20200101/us-east-1/ec2/aws4_request
+re_scope = re.compile(r'Credential=[^/]+/\d{8}/([a-z0-9-]+)/')
+
+default_regions = [
+    'ap-northeast-1', 'ap-south-1', 'ap-southeast-1', 'ap-southeast-2', 'ca-central-1',
+    'eu-central-1', 'eu-west-1', 'eu-west-2', 'sa-east-1', 'us-east-1', 'us-east-2', 'us-west-2'
+]
+
+
+class ApiError(Exception):
+    """EC2 api error returned to the client"""
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status, self.code, self.message = status, code, message
+
+
+def _values(params, prefix):
+    """Values of a list parameter: InstanceType.1, InstanceType.2, ..."""
+    keys = sorted((k for k in params if k.startswith(prefix + '.')), key=lambda x: int(x.rsplit('.', 1)[1]))
+    return [params[k] for k in keys]
+
+
+def request_filters(params):
+    """
+        Filters of a DescribeSpotPriceHistory request, from request
+        parameters and supported Filter.N entries
+
+    Returns:
+        keyword arguments of SyntheticHistory.history, TYPE: dict
+    """
+    instance_types = _values(params, 'InstanceType')
+    product_descriptions = _values(params, 'ProductDescription')
+    availability_zone = params.get('AvailabilityZone')
+
+    for index in sorted({k.split('.')[1] for k in params if re.match(r'Filter\.\d+\.Name$', k)}, key=int):
+        name = params['Filter.{}.Name'.format(index)]
+        values = _values(params, 'Filter.{}.Value'.format(index))
+        if name == 'instance-type':
+            instance_types += values
+        elif name == 'product-description':
+            product_descriptions += values
+        elif name == 'availability-zone' and values:
+            availability_zone = values[0]
+
+    return {
+        'instance_types': instance_types or None,
+        'product_descriptions': product_descriptions or None,
+        'availability_zone': availability_zone
+    }
+
+
+class MockSpotPriceServer():
+    """
+    Threaded local http server emulating the EC2 spot price api.
+    Counters of requests served and throttled are kept in stats.
+    """
+    def __init__(self, history=None, host='127.0.0.1', port=0, max_results=1000, latency=0.0,
+                 jitter=0.0, throttle=0.0, rate_limit=None, regions=None, seed=None):
+        """
+        Args:
+            :history (SyntheticHistory): source of price data. DEFAULT: SyntheticHistory()
+            :host (str): interface to listen on
+            :port (int): port to listen on; 0 selects a free port
+            :max_results (int): maximum records per page, the upper bound of MaxResults
+            :latency (float): seconds added to every response
+            :jitter (float): maximum random seconds added to latency
+            :throttle (float): probability of a RequestLimitExceeded response
+            :rate_limit (float): requests per second above which requests are throttled
+            :regions (list): region codes returned by DescribeRegions
+            :seed (int): seed of latency jitter and random throttling
+        """
+        self.history = history or SyntheticHistory()
+        self.max_results = max_results
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle = throttle
+        self.rate_limit = rate_limit
+        self.regions = list(regions or default_regions)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'pages': 0, 'records': 0, 'throttled': 0}
+        self._results = {}              # query => history, for pagination
+        self._window = []               # arrival times of requests within the last second
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def endpoint_url(self):
+        host, port = self.httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode('utf-8')
+                params = {k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()}
+                match = re_scope.search(self.headers.get('Authorization', ''))
+                region = match.group(1) if match else 'us-east-1'
+                status, payload = server.respond(region, params)
+                data = payload.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/xml;charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def respond(self, region, params):
+        """
+            Handles a single api request
+
+        Returns:
+            http status, xml body, TYPE: tuple
+        """
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            throttled = self._throttled()
+            if throttled:
+                self.stats['throttled'] += 1
+        if delay:
+            time.sleep(delay)
+
+        try:
+            if throttled:
+                # as EC2; botocore retries these itself unless its retries are disabled
+                raise ApiError(503, 'RequestLimitExceeded', 'Request limit exceeded.')
+            action = params.get('Action')
+            if action == 'DescribeSpotPriceHistory':
+                return 200, self.describe_spot_price_history(region, params)
+            elif action == 'DescribeRegions':
+                return 200, self.describe_regions()
+            raise ApiError(400, 'InvalidAction', 'The action {} is not valid for this web service.'.format(action))
+
+        except ApiError as e:
+            return e.status, self._error(e)
+
+    def _throttled(self):
+        if self.throttle and self.random.random() < self.throttle:
+            return True
+        if self.rate_limit:
+            now = time.monotonic()
+            self._window = [x for x in self._window if now - x < 1.0]
+            if len(self._window) >= self.rate_limit:
+                return True
+            self._window.append(now)
+        return False
+
+    def describe_spot_price_history(self, region, params):
+        try:
+            start = parse_datetime(params['StartTime']) if 'StartTime' in params else None
+            end = parse_datetime(params['EndTime']) if 'EndTime' in params else None
+            size = int(params.get('MaxResults') or self.max_results)
+            offset = int(params.get('NextToken') or 0)
+        except ValueError as e:
+            raise ApiError(400, 'InvalidParameterValue', str(e))
+        if not 1 <= size:
+            raise ApiError(400, 'InvalidParameterValue', 'MaxResults must be positive')
+
+        end = end or datetime.datetime.now(datetime.timezone.utc)
+        start = start or end
+        filters = request_filters(params)
+        prices = self._history(region, start, end, filters)
+
+        page = prices[offset:offset + min(size, self.max_results)]
+        next_offset = offset + len(page)
+        with self.lock:
+            self.stats['pages'] += 1
+            self.stats['records'] += len(page)
+
+        items = ''.join(
+            '<item><instanceType>{}</instanceType><productDescription>{}</productDescription>'
+            '<spotPrice>{}</spotPrice><timestamp>{}</timestamp>'
+            '<availabilityZone>{}</availabilityZone></item>'.format(
+                escape(x['InstanceType']), escape(x['ProductDescription']), x['SpotPrice'],
+                x['Timestamp'].strftime('%Y-%m-%dT%H:%M:%S.000Z'), escape(x['AvailabilityZone'])
+            ) for x in page
+        )
+        token = '<nextToken>{}</nextToken>'.format(next_offset) if next_offset < len(prices) else ''
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<DescribeSpotPriceHistoryResponse xmlns="{}"><requestId>{}</requestId>'
+            '<spotPriceHistorySet>{}</spotPriceHistorySet>{}</DescribeSpotPriceHistoryResponse>'
+        ).format(xmlns, uuid.uuid4(), items, token)
+
+    def _history(self, region, start, end, filters):
+        """History of a query, cached while its pages are requested"""
+        key = (region, start, end, repr(sorted(filters.items())))
+        with self.lock:
+            prices = self._results.get(key)
+        if prices is None:
+            prices = self.history.history(region, start, end, **filters)
+            with self.lock:
+                if len(self._results) >= 256:
+                    self._results.pop(next(iter(self._results)))
+                self._results[key] = prices
+        return prices
+
+    def describe_regions(self):
+        items = ''.join(
+            '<item><regionName>{0}</regionName><regionEndpoint>ec2.{0}.amazonaws.com</regionEndpoint>'
+            '<optInStatus>opt-in-not-required</optInStatus></item>'.format(x) for x in self.regions
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<DescribeRegionsResponse xmlns="{}"><requestId>{}</requestId>'
+            '<regionInfo>{}</regionInfo></DescribeRegionsResponse>'
+        ).format(xmlns, uuid.uuid4(), items)
+
+    @staticmethod
+    def _error(e):
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n<Response><Errors><Error><Code>{}</Code>'
+            '<Message>{}</Message></Error></Errors><RequestID>{}</RequestID></Response>'
+        ).format(e.code, escape(e.message), uuid.uuid4())
+
+    def start(self):
+        """Serves requests in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the EC2 spot price api')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-results', type=int, default=1000, help='maximum records per page')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to each response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='maximum random seconds added to latency')
+    parser.add_argument('--throttle', type=float, default=0.0, help='probability of throttling a request')
+    parser.add_argument('--rate-limit', type=float, default=None, help='requests/s above which to throttle')
+    parser.add_argument('--changes-per-day', type=float, default=4, help='mean price changes per series and day')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockSpotPriceServer(
+        SyntheticHistory(changes_per_day=args.changes_per_day, seed=args.seed),
+        host=args.host, port=args.port, max_results=args.max_results, latency=args.latency,
+        jitter=args.jitter, throttle=args.throttle, rate_limit=args.rate_limit, seed=args.seed
+    )
+    print('Serving EC2 spot price api on {} (Ctrl-C to stop)'.format(server.endpoint_url))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Class:  SyntheticHistory
+        - deterministic, realistic spot price histories for offline
+          testing.  Each series (availability zone, instance type,
+          product description) changes price at random times, a few
+          times per day on average, around a base price scaled by
+          instance size and operating system.
+        - the history of any time window is reproducible: price
+          changes are generated per series and utc day from a seed,
+          so overlapping or paginated requests agree.
+
+"""
+import random
+import hashlib
+import datetime
+import threading
+
+
+# instance families and sizes; price doubles with each size step
+families = {'c5': 0.085, 'c5d': 0.096, 'm5': 0.096, 'm5d': 0.113, 'r5': 0.126, 't3': 0.0104}
+sizes = ('large', 'xlarge', '2xlarge', '4xlarge', '8xlarge')
+
+# product description => multiple of the Linux/UNIX price
+products = {
+    'Linux/UNIX': 1.0,
+    'Linux/UNIX (Amazon VPC)': 1.0,
+    'SUSE Linux': 1.3,
+    'Red Hat Enterprise Linux': 1.6,
+    'Windows': 1.9
+}
+
+utc = datetime.timezone.utc
+
+# maximum number of (series, day) price change lists kept by a SyntheticHistory
+day_cache_size = 65536
+
+
+class SyntheticHistory():
+    """
+    Generator of synthetic describe_spot_price_history results
+
+    Use:
+        >>>  history = SyntheticHistory(changes_per_day=6)
+        >>>  prices = history.history('eu-west-1', start, end, instance_types=['m5.large'])
+        >>>  prices[0]
+        {'AvailabilityZone': 'eu-west-1c', 'InstanceType': 'm5.large', ...}
+    """
+    def __init__(self, instance_types=None, product_descriptions=None, zones=('a', 'b', 'c'),
+                 changes_per_day=4, discount=0.35, seed=0):
+        """
+        Args:
+            :instance_types (list): DEFAULT: all families x sizes (30 types)
+            :product_descriptions (list): DEFAULT: all products (5)
+            :zones (tuple): availability zone suffixes of every region
+            :changes_per_day (float): mean price changes per series and day
+            :discount (float): mean spot price as a fraction of the base price
+            :seed (int): seed of all random choices
+        """
+        self.instance_types = list(instance_types or [
+            family + '.' + size for family in families for size in sizes
+        ])
+        self.product_descriptions = list(product_descriptions or products)
+        self.zones = tuple(zones)
+        self.changes_per_day = changes_per_day
+        self.discount = discount
+        self.seed = seed
+        self._days = {}                 # (series, ordinal) => price changes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def base_price(instance_type, product_description):
+        """On demand style reference price of an instance type and product"""
+        family, _, size = instance_type.partition('.')
+        step = sizes.index(size) if size in sizes else 0
+        return families.get(family, 0.1) * 2 ** step * products.get(product_description, 1.0)
+
+    def series(self, region, instance_types=None, product_descriptions=None, availability_zone=None):
+        """
+            Series of a region matching the filters given
+
+        Returns:
+            (availability zone, instance type, product description) tuples, TYPE: list
+        """
+        zones = [region + x for x in self.zones]
+        if availability_zone:
+            zones = [x for x in zones if x == availability_zone]
+        types = [x for x in self.instance_types if not instance_types or x in instance_types]
+        oses = [x for x in self.product_descriptions if not product_descriptions or x in product_descriptions]
+        return [(z, t, p) for z in zones for t in types for p in oses]
+
+    def _day(self, series, ordinal):
+        """Price changes of a series on a utc day: [(epoch seconds, price str), ...] ascending"""
+        key = (series, ordinal)
+        changes = self._days.get(key)
+        if changes is None:
+            changes = self._generate_day(series, ordinal)
+            with self._lock:
+                if len(self._days) >= day_cache_size:
+                    self._days.pop(next(iter(self._days)))
+                self._days[key] = changes
+        return changes
+
+    def _generate_day(self, series, ordinal):
+        """Generates the price changes of a series and day from the seed"""
+        digest = hashlib.sha1(repr((self.seed, series, ordinal)).encode('utf-8')).digest()
+        rng = random.Random(int.from_bytes(digest[:8], 'big'))
+        midnight = (ordinal - datetime.date(1970, 1, 1).toordinal()) * 86400
+        base = self.base_price(series[1], series[2]) * self.discount
+
+        # at least one change per day so the price in effect is always found nearby
+        count = max(1, int(rng.expovariate(1.0 / self.changes_per_day) + 0.5))
+        seconds = sorted(rng.randrange(86400) for _ in range(count))
+        return [
+            (midnight + x, '%.6f' % (base * rng.uniform(0.7, 1.3))) for x in seconds
+        ]
+
+    def _changes(self, series, start, end):
+        """Price changes of a series with start <= Timestamp <= end, plus the one in effect at start"""
+        first, last = int(start.timestamp()), int(end.timestamp())
+        changes = []
+        for ordinal in range(start.toordinal() - 1, end.toordinal() + 1):
+            changes.extend(self._day(series, ordinal))
+        prior = [x for x in changes if x[0] < first]
+        inside = [x for x in changes if first <= x[0] <= last]
+        return prior[-1:] + inside
+
+    def history(self, region, start, end, instance_types=None, product_descriptions=None,
+                availability_zone=None):
+        """
+            Spot price history of a region in the order returned by AWS,
+            newest first; includes the price of each series in effect
+            at start
+
+        Args:
+            :region (str): AWS region code (e.g. us-east-1)
+            :start (datetime): start of the window; naive datetimes are utc
+            :end (datetime): end of the window
+            :instance_types (list): restrict to instance types
+            :product_descriptions (list): restrict to product descriptions
+            :availability_zone (str): restrict to an availability zone
+
+        Returns:
+            spot price dicts, Timestamp as timezone aware datetime, TYPE: list
+        """
+        start = start.replace(tzinfo=utc) if start.tzinfo is None else start.astimezone(utc)
+        end = end.replace(tzinfo=utc) if end.tzinfo is None else end.astimezone(utc)
+        prices = [
+            (ts, series, price)
+            for series in self.series(region, instance_types, product_descriptions, availability_zone)
+            for ts, price in self._changes(series, start, end)
+        ]
+        prices.sort(key=lambda x: (-x[0], x[1]))
+        return [
+            {
+                'AvailabilityZone': series[0],
+                'InstanceType': series[1],
+                'ProductDescription': series[2],
+                'SpotPrice': price,
+                'Timestamp': datetime.datetime.fromtimestamp(ts, tz=utc)
+            } for ts, series, price in prices
+        ]
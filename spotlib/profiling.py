@@ -0,0 +1,197 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Class:  Profiler
+        - opt-in cpu (cProfile) and memory (tracemalloc) profiling of a
+          spotcli run, divided into sections: setup, then one section
+          per region retrieved, each annotated with its region and time
+          window.
+        - cpu: the pstats of the whole run are written to a file for
+          pstats or snakeviz, and a text report of the functions with
+          the highest cumulative time in each section next to it.
+        - memory: a text report of the peak traced memory of each
+          section and the source lines whose allocations grew most.
+
+    cProfile observes the calling thread only; with --shards or
+    workers > 1, time spent in pagination threads appears as waits
+    of the main thread.
+
+"""
+import io
+import sys
+import time
+import atexit
+import pstats
+import cProfile
+import datetime
+import tracemalloc
+
+
+# frames of the profiling machinery excluded from memory reports
+_exclude = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>')
+]
+
+
+class Profiler():
+    """
+    Profiles a run section by section.  All methods are no-ops unless
+    cpu or memory profiling is requested.
+
+    Use:
+        >>>  profiler = Profiler(cpu='spotcli.pstats').start()
+        >>>  for region in regions:
+        ...      profiler.section(region, region=region, start=start, end=end)
+        ...      retrieve(region)
+        >>>  profiler.stop()
+    """
+    def __init__(self, cpu=None, memory=None, top=30, frames=10):
+        """
+        Args:
+            :cpu (str): path of the pstats file written; a text report
+                is written to the same path with .txt appended
+            :memory (str): path of the memory report written
+            :top (int): number of functions or source lines per section
+            :frames (int): traceback depth stored per memory allocation
+        """
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.frames = frames
+        self.enabled = bool(cpu or memory)
+        self.labels = {}
+        self.sections = []          # [{'name', 'labels', 'seconds', 'profile', 'memory'}]
+        self._current = None
+        self._snapshot = None
+
+    def start(self, **labels):
+        """
+            Starts profiling with a setup section
+
+        Args:
+            :labels: annotations of the whole run written in report headers
+        """
+        if not self.enabled or self._current is not None:
+            return self
+        self.labels = labels
+        if self.memory:
+            tracemalloc.start(self.frames)
+            self._snapshot = tracemalloc.take_snapshot().filter_traces(_exclude)
+        atexit.register(self.stop)
+        self._open('setup', {})
+        return self
+
+    def section(self, name, **labels):
+        """
+            Ends the current section and starts section name
+
+        Args:
+            :name (str): section name (e.g. region code)
+            :labels: annotations of the section, such as region, start, end
+        """
+        if self._current is None:
+            return
+        self._close()
+        self._open(name, labels)
+
+    def stop(self):
+        """Ends profiling and writes the reports; returns the paths written"""
+        if self._current is None:
+            return []
+        self._close()
+        atexit.unregister(self.stop)
+
+        paths = []
+        if self.cpu:
+            paths.extend(self._write_cpu())
+        if self.memory:
+            tracemalloc.stop()
+            paths.append(self._write(self.memory, self._memory_report()))
+        return paths
+
+    def _open(self, name, labels):
+        self._current = {'name': name, 'labels': labels, 'profile': None, 'memory': None}
+        if self.memory and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self._current['start'] = time.perf_counter()
+        if self.cpu:
+            self._current['profile'] = cProfile.Profile()
+            self._current['profile'].enable()
+
+    def _close(self):
+        current, self._current = self._current, None
+        if current['profile'] is not None:
+            current['profile'].disable()
+        current['seconds'] = time.perf_counter() - current.pop('start')
+
+        if self.memory:
+            size, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces(_exclude)
+            growth = snapshot.compare_to(self._snapshot, 'lineno')
+            current['memory'] = {
+                'current': size,
+                'peak': peak,
+                'growth': [x for x in growth if x.size_diff > 0][:self.top]
+            }
+            self._snapshot = snapshot
+        self.sections.append(current)
+
+    @staticmethod
+    def _annotation(labels):
+        return ', '.join('{}: {}'.format(k, v) for k, v in labels.items() if v is not None)
+
+    def _header(self, title):
+        lines = [
+            title,
+            'created: {}'.format(datetime.datetime.now().isoformat(timespec='seconds')),
+            'command: {}'.format(' '.join(sys.argv))
+        ]
+        if self.labels:
+            lines.append(self._annotation(self.labels))
+        return lines
+
+    def _section_header(self, section):
+        annotation = self._annotation(section['labels'])
+        return [
+            '',
+            '=' * 79,
+            'section {}{}  ({:.3f}s)'.format(
+                section['name'], ' [' + annotation + ']' if annotation else '', section['seconds']),
+            '=' * 79
+        ]
+
+    def _write_cpu(self):
+        profiles = [x['profile'] for x in self.sections]
+        pstats.Stats(*profiles).dump_stats(self.cpu)
+
+        lines = self._header('spotcli cpu profile; pstats of the whole run in {}'.format(self.cpu))
+        for section in self.sections:
+            lines.extend(self._section_header(section))
+            stream = io.StringIO()
+            pstats.Stats(section['profile'], stream=stream).sort_stats('cumulative').print_stats(self.top)
+            lines.append(stream.getvalue().strip('\n'))
+        return [self.cpu, self._write(self.cpu + '.txt', lines)]
+
+    def _memory_report(self):
+        lines = self._header('spotcli memory profile; allocations traced {} frames deep'.format(self.frames))
+        for section in self.sections:
+            memory = section['memory']
+            lines.extend(self._section_header(section))
+            lines.append('peak traced: {:.1f} MiB, traced at end: {:.1f} MiB'.format(
+                memory['peak'] / 2 ** 20, memory['current'] / 2 ** 20))
+            lines.append('largest growth of allocations alive at end of section:')
+            lines.extend('  ' + str(x) for x in memory['growth'])
+        return lines
+
+    @staticmethod
+    def _write(path, lines):
+        with open(path, 'w') as f1:
+            f1.write('\n'.join(lines) + '\n')
+        return path
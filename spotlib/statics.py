@@ -60,6 +60,15 @@
     config_dirpath = os_parityPath(os.path.join(config_dir, config_subdir))
     config_path = os_parityPath(os.path.join(config_dirpath, config_filename))
 
+    # region catalog cache
+    region_cache_filename = 'regions.json'
+    region_cache_path = os_parityPath(os.path.join('~', config_dirpath, region_cache_filename))
+    region_cache_ttl = 7 * 24 * 3600      # seconds
+
+    # incremental retrieval high-water marks
+    watermark_filename = 'watermarks.json'
+    watermark_path = os_parityPath(os.path.join('~', config_dirpath, watermark_filename))
+
     # logging parameters
     enable_logging = False
     log_mode = 'STREAM'
@@ -0,0 +1,196 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Class:  SpotPriceStore
+        - local SQLite database of spot price data, indexed for
+          time range and instance type queries.
+        - records are ingested in batched transactions; a record
+          already present (same availability zone, instance type,
+          product description and Timestamp) is ignored, so
+          overlapping retrievals may be loaded repeatedly.
+
+"""
+import sqlite3
+import inspect
+import datetime
+from spotlib import logger
+from spotlib.core.columnar import epoch_seconds
+
+
+schema = """
+    CREATE TABLE IF NOT EXISTS spot_prices (
+        availability_zone   TEXT NOT NULL,
+        instance_type       TEXT NOT NULL,
+        product_description TEXT NOT NULL,
+        spot_price          REAL NOT NULL,
+        timestamp           INTEGER NOT NULL,
+        PRIMARY KEY (availability_zone, instance_type, product_description, timestamp)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS spot_prices_instance_type
+        ON spot_prices (instance_type, timestamp);
+    CREATE INDEX IF NOT EXISTS spot_prices_timestamp
+        ON spot_prices (timestamp);
+"""
+
+insert = """
+    INSERT OR IGNORE INTO spot_prices
+        (availability_zone, instance_type, product_description, spot_price, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+class SpotPriceStore():
+    """
+    SQLite database of spot price data.  Also a streaming writer of
+    spotlib.writers, selected by spotcli --format sqlite.
+
+    Use:
+        >>>  with SpotPriceStore('spotprices.sqlite') as store:
+        ...      store.ingest(sp.stream_pricedata(['eu-west-1']))
+        ...      store.history('m5.large', 'eu-west-1a', start='2019-09-03T00:00:00Z')
+        [{'AvailabilityZone': 'eu-west-1a', 'InstanceType': 'm5.large', ...}, ...]
+    """
+    extension = '.sqlite'
+    dtstrings = False
+    appendable = True
+    codecs = (None,)
+
+    def __init__(self, filename, batch_size=10000, compress=None, append=True):
+        """
+        Args:
+            :filename (str): path of the database on the local filesystem
+            :batch_size (int): number of records inserted per transaction
+            :compress (str): unsupported; must be None
+            :append (bool): accepted for compatibility with spotlib.writers;
+                records are always added to an existing database
+        """
+        if compress not in self.codecs:
+            raise ValueError('Unsupported sqlite compression codec: {}'.format(compress))
+
+        self.filename = filename
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(schema)
+
+    @classmethod
+    def suffix(cls, compress=None):
+        """Filename extension of the database"""
+        return cls.extension
+
+    def write(self, record):
+        """Adds a single spot price dict"""
+        self.buffer.append((
+            record['AvailabilityZone'],
+            record['InstanceType'],
+            record['ProductDescription'],
+            float(record['SpotPrice']),
+            epoch_seconds(record['Timestamp'])
+        ))
+        self.count += 1
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records):
+        """Adds a list (page) of spot price dicts"""
+        for record in records:
+            self.write(record)
+
+    def ingest(self, records):
+        """
+            Adds spot price data and commits it
+
+        Args:
+            :records (iterable): spot price dicts, e.g. EC2SpotPrices.stream_pricedata
+
+        Returns:
+            number of records added to the database, TYPE: int
+        """
+        before = self.conn.total_changes
+        self.write_many(records)
+        self.flush()
+        return self.conn.total_changes - before
+
+    def flush(self):
+        """Inserts buffered records in a single transaction"""
+        if self.buffer:
+            with self.conn:
+                self.conn.executemany(insert, self.buffer)
+            self.buffer = []
+
+    def history(self, instance_type, availability_zone=None, start=None, end=None,
+                product_description=None, dtstrings=False):
+        """
+            Price history of an instance type in time order
+
+        Args:
+            :instance_type (str): EC2 instance type, e.g. m5.large
+            :availability_zone (str): restrict to one availability zone
+            :start (datetime): earliest Timestamp; datetime, epoch seconds
+                or utc string (2019-09-03T00:00:00Z)
+            :end (datetime): latest Timestamp, as start
+            :product_description (str): restrict to one product description
+            :dtstrings (bool): True returns Timestamp as utc string, DEFAULT: False
+
+        Returns:
+            spot price dicts, TYPE: list
+        """
+        clauses, args = ['instance_type = ?'], [instance_type]
+
+        for column, value in (('availability_zone', availability_zone),
+                              ('product_description', product_description)):
+            if value is not None:
+                clauses.append(column + ' = ?')
+                args.append(value)
+        if start is not None:
+            clauses.append('timestamp >= ?')
+            args.append(epoch_seconds(start))
+        if end is not None:
+            clauses.append('timestamp <= ?')
+            args.append(epoch_seconds(end))
+
+        self.flush()
+        rows = self.conn.execute(
+            'SELECT availability_zone, instance_type, product_description, spot_price, timestamp '
+            'FROM spot_prices WHERE ' + ' AND '.join(clauses) + ' ORDER BY timestamp', args
+        )
+        return [self._dict(row, dtstrings) for row in rows]
+
+    @staticmethod
+    def _dict(row, dtstrings=False):
+        dt = datetime.datetime.fromtimestamp(row[4], tz=datetime.timezone.utc)
+        return {
+            'AvailabilityZone': row[0],
+            'InstanceType': row[1],
+            'ProductDescription': row[2],
+            'SpotPrice': row[3],
+            'Timestamp': dt.strftime('%Y-%m-%dT%H:%M:%SZ') if dtstrings else dt
+        }
+
+    def close(self):
+        """Inserts buffered records and closes the database"""
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+        logger.info(
+            '%s: Wrote %d records to %s' % (inspect.stack()[0][3], self.count, self.filename))
+
+    def __len__(self):
+        self.flush()
+        return self.conn.execute('SELECT COUNT(*) FROM spot_prices').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,293 @@
+"""
+Summary.
+
+    EC2 SpotPrice Lib, GPL v3 License
+
+    Copyright (c) 2018-2020 Blake Huber
+
+    Python 3 Module:  streaming writers for spot price data
+        - records are written to the local filesystem as they are
+          received, so the complete price history of a region is
+          never held in memory.
+
+"""
+import os
+import json
+import inspect
+from spotlib import logger
+from spotlib.common import open_file, compression
+from spotlib.core.columnar import to_recordbatch, arrow_schema, import_pyarrow
+from spotlib.store import SpotPriceStore
+
+
+class StreamWriter():
+    """
+    Base class of the streaming writers.  Subclasses set the class
+    attributes below and implement write, write_many and close.
+    """
+    extension = ''
+    dtstrings = True
+    appendable = False
+
+    # compression codecs accepted by the compress parameter
+    codecs = (None,) + tuple(compression)
+
+    @classmethod
+    def suffix(cls, compress=None):
+        """Filename extension of output written with the codec given"""
+        return cls.extension + (compression[compress][0] if compress else '')
+
+    def flush(self):
+        """
+            Writes buffered records so that they reach the file.  Called
+            for every writer type after each page; writers without a
+            buffer of their own have nothing to do.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class JsonWriter(StreamWriter):
+    """
+    Writes spot price dicts incrementally to a json document with the
+    same schema and layout as libtools.js.export_iterobject:
+
+    .. code: json
+
+        {
+            "SpotPriceHistory": [
+                {
+                    "AvailabilityZone": "eu-west-1a",
+                    ...
+                },
+                ...
+            ]
+        }
+
+    Use:
+        >>>  with JsonWriter('eu-west-1/prices.json') as writer:
+        ...      for page in sp.stream_pricedata(['eu-west-1'], dtstrings=True, pages=True):
+        ...          writer.write_many(page)
+    """
+    extension = '.json'
+    dtstrings = True
+    appendable = False
+
+    def __init__(self, filename, key='SpotPriceHistory', compress=None):
+        """
+        Args:
+            :filename (str): path of the json document on the local filesystem
+            :key (str): name of the top level key containing the list of records
+            :compress (str): compression applied while writing: gzip, xz, zstd
+                or None. DEFAULT: None
+        """
+        self.filename = filename
+        self.key = key
+        self.count = 0
+        self.handle = open_file(filename, 'wt', compress)
+        self.handle.write('{\n    ' + json.dumps(key) + ': [')
+
+    def write(self, record):
+        """Appends a single spot price dict to the document"""
+        body = json.dumps(record, indent=4, sort_keys=True, default=str)
+        self.handle.write(('\n' if self.count == 0 else ',\n') + self._indent(body))
+        self.count += 1
+
+    def write_many(self, records):
+        """Appends a list (page) of spot price dicts to the document"""
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """Flushes records written; the document is only valid once closed"""
+        self.handle.flush()
+
+    def close(self):
+        """Terminates the json document and closes the file"""
+        if self.handle.closed:
+            return
+        self.handle.write('\n    ]\n}' if self.count else ']\n}')
+        self.handle.close()
+        logger.info(
+            '%s: Wrote %d records to %s' % (inspect.stack()[0][3], self.count, self.filename))
+
+    @staticmethod
+    def _indent(body, width=8):
+        pad = ' ' * width
+        return '\n'.join(pad + line for line in body.split('\n'))
+
+
+class NdjsonWriter(JsonWriter):
+    """
+    Writes spot price dicts to a JSON Lines (ndjson) file, one compact
+    json object per line.  Serialized records are buffered and flushed
+    to the file in chunks of buffer_size records.
+
+    Use:
+        >>>  with NdjsonWriter('eu-west-1/prices.ndjson') as writer:
+        ...      for page in sp.stream_pricedata(['eu-west-1'], dtstrings=True, pages=True):
+        ...          writer.write_many(page)
+    """
+    extension = '.ndjson'
+    appendable = True
+
+    def __init__(self, filename, buffer_size=1000, compress=None, append=False, offset=None):
+        """
+        Args:
+            :filename (str): path of the ndjson file on the local filesystem
+            :buffer_size (int): number of records buffered between writes
+            :compress (str): compression applied while writing: gzip, xz, zstd
+                or None. DEFAULT: None
+            :append (bool): add records to the end of an existing file. Each
+                compression codec above supports concatenated streams.
+                DEFAULT: False
+            :offset (int): with append, truncates the file to offset bytes
+                first, e.g. to the size recorded by a checkpoint. DEFAULT: None
+        """
+        self.filename = filename
+        self.compress = compress
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.count = 0
+        self.flushed = 0                # records in the file when last flushed
+        self.closed = False
+        if append and offset is not None:
+            # discard records written after the offset; a compressed
+            # stream ending there may be incomplete
+            os.truncate(filename, offset)
+        self.handle = open_file(filename, 'at' if append else 'wt', compress)
+
+    def write(self, record):
+        """Appends a single spot price dict to the file"""
+        self.buffer.append(json.dumps(record, separators=(',', ':'), default=str))
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self._write_buffer()
+
+    def _write_buffer(self):
+        if self.buffer:
+            if self.handle is None:
+                self.handle = open_file(self.filename, 'at', self.compress)
+            self.handle.write('\n'.join(self.buffer) + '\n')
+            self.buffer = []
+
+    def flush(self):
+        """
+            Writes buffered records so that the file holds every record
+            written.  Compressed output cannot be read up to a point part
+            way through a stream, so the stream is ended; records written
+            later are appended to the file as a new stream.
+
+        Returns:
+            size of the file in bytes, TYPE: int
+        """
+        self._write_buffer()
+        if self.handle is not None and self.flushed != self.count:
+            if self.compress is None:
+                self.handle.flush()
+            else:
+                self.handle.close()
+                self.handle = None      # reopened by the next write
+            self.flushed = self.count
+        return os.path.getsize(self.filename)
+
+    def close(self):
+        """Writes buffered records and closes the file"""
+        if self.closed:
+            return
+        self._write_buffer()
+        if self.handle is not None:
+            self.handle.close()
+        self.closed = True
+        logger.info(
+            '%s: Wrote %d records to %s' % (inspect.stack()[0][3], self.count, self.filename))
+
+
+class ParquetWriter(StreamWriter):
+    """
+    Writes spot price dicts to an Apache Parquet file (see
+    spotlib.core.columnar.arrow_schema).  Records are buffered and
+    written as a row group each time row_group_size records accumulate.
+    Parquet has no second resolution timestamp type, so Timestamp is
+    stored in milliseconds.  Requires the optional pyarrow package.
+
+    Use:
+        >>>  with ParquetWriter('eu-west-1/prices.parquet', compress='zstd') as writer:
+        ...      for page in sp.stream_pricedata(['eu-west-1'], pages=True):
+        ...          writer.write_many(page)
+    """
+    extension = '.parquet'
+    dtstrings = False
+    appendable = False
+
+    # parquet compresses column chunks internally; xz is not supported
+    codecs = {None: 'snappy', 'gzip': 'gzip', 'zstd': 'zstd'}
+
+    def __init__(self, filename, row_group_size=100000, compress=None):
+        """
+        Args:
+            :filename (str): path of the parquet file on the local filesystem
+            :row_group_size (int): number of records per row group
+            :compress (str): column compression: gzip, zstd or None (snappy).
+                DEFAULT: None
+        """
+        if compress not in self.codecs:
+            raise ValueError('Unsupported parquet compression codec: {}'.format(compress))
+
+        import_pyarrow()                # logs when pyarrow is not installed
+        import pyarrow.parquet as pq
+
+        self.filename = filename
+        self.row_group_size = row_group_size
+        self.buffer = []
+        self.count = 0
+        self.handle = pq.ParquetWriter(filename, arrow_schema(), compression=self.codecs[compress])
+
+    @classmethod
+    def suffix(cls, compress=None):
+        """Filename extension; compression is internal to parquet files"""
+        return cls.extension
+
+    def write(self, record):
+        """Appends a single spot price dict to the file"""
+        self.buffer.append(record)
+        self.count += 1
+        if len(self.buffer) >= self.row_group_size:
+            self.flush()
+
+    def write_many(self, records):
+        """Appends a list (page) of spot price dicts to the file"""
+        self.buffer.extend(records)
+        self.count += len(records)
+        if len(self.buffer) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered records to the file as a row group"""
+        if self.buffer:
+            self.handle.write_batch(to_recordbatch(self.buffer))
+            self.buffer = []
+
+    def close(self):
+        """Writes remaining buffered records and the parquet footer"""
+        if self.handle is None:
+            return
+        self.flush()
+        self.handle.close()
+        self.handle = None
+        logger.info(
+            '%s: Wrote %d records to %s' % (inspect.stack()[0][3], self.count, self.filename))
+
+
+# output formats supported by spotcli --format
+writers = {
+    'json': JsonWriter,
+    'ndjson': NdjsonWriter,
+    'parquet': ParquetWriter,
+    'sqlite': SpotPriceStore
+}
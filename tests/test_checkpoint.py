@@ -0,0 +1,55 @@
+import os
+import datetime
+from botocore.paginate import TokenDecoder
+from spotlib.core.checkpoint import Checkpoint, CheckpointPage
+
+
+start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+end = datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc)
+
+
+def test_checkpoint_resume(tmpdir):
+    path = os.path.join(str(tmpdir), 'spotprices.checkpoint')
+    checkpoint = Checkpoint(path)
+    key = Checkpoint.key('us-east-1', start, end, {'InstanceTypes': ['m5.large']})
+    assert checkpoint.register(key, 'us-east-1', start, end)['done'] is False
+    assert checkpoint.starting_token(key) is None
+    checkpoint.advance(key, 'abc', 1000)
+
+    resumed = Checkpoint(path)
+    resumed.register(key, 'us-east-1', start, end)
+    assert resumed.started('us-east-1') and not resumed.done('us-east-1')
+    assert TokenDecoder().decode(resumed.starting_token(key)) == {'NextToken': 'abc'}
+
+    resumed.advance(key, None, 10)
+    assert resumed.done('us-east-1')
+    assert resumed.get(key)['count'] == 1010
+
+
+def test_checkpoint_complete(tmpdir):
+    path = os.path.join(str(tmpdir), 'spotprices.checkpoint')
+    checkpoint = Checkpoint(path)
+    checkpoint.complete('us-east-1/prices.json')
+    assert Checkpoint(path).completed('us-east-1/prices.json')
+    checkpoint.clear()
+    assert not os.path.exists(path)
+
+
+def test_checkpoint_page():
+    page = CheckpointPage([1, 2, 3], ('key', 'abc', 3))
+    subset = CheckpointPage.derive(page, [x for x in page if x > 1])
+    assert subset == [2, 3] and subset.state == ('key', 'abc', 3)
+    assert CheckpointPage.derive([1, 2], [2]) == [2]
+
+
+def test_checkpoint_offset(tmpdir):
+    path = os.path.join(str(tmpdir), 'spotprices.checkpoint')
+    checkpoint = Checkpoint(path)
+    key = Checkpoint.key('us-east-1', start, end)
+    checkpoint.register(key, 'us-east-1', start, end)
+    checkpoint.advance(key, 'abc', 1000)
+    assert checkpoint.offset('us-east-1') is None
+    checkpoint.advance(key, 'def', 1000, offset=4096)
+    assert Checkpoint(path).offset('us-east-1') == 4096
+    checkpoint.discard('us-east-1')
+    assert Checkpoint(path).offset('us-east-1') is None
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import glob
+import datetime
+import pytest
+from spotlib import cli
+from spotlib.core import spotcore
+from spotlib.core.ancillary import clear_session_cache
+from spotlib.core.watermarks import WatermarkStore
+from spotlib.common import open_file
+from spotlib.writers import NdjsonWriter
+from spotlib.store import SpotPriceStore
+from spotlib.mock import MockSpotPriceServer, SyntheticHistory
+
+
+history = SyntheticHistory(instance_types=['m5.large', 'c5.xlarge'], product_descriptions=['Linux/UNIX'],
+                           changes_per_day=24)
+
+
+@pytest.fixture
+def workdir(tmpdir, monkeypatch):
+    """Isolated working directory, aws credentials and watermark file"""
+    credentials = tmpdir.join('credentials')
+    credentials.write('[default]\naws_access_key_id = mock\naws_secret_access_key = mock\n')
+    monkeypatch.setenv('AWS_SHARED_CREDENTIALS_FILE', str(credentials))
+    monkeypatch.setenv('AWS_CONFIG_FILE', os.devnull)
+    watermarks = str(tmpdir.join('watermarks.json'))
+    monkeypatch.setattr(spotcore, 'WatermarkStore', lambda *args: WatermarkStore(watermarks))
+    monkeypatch.chdir(tmpdir)
+    clear_session_cache()
+    yield tmpdir
+    clear_session_cache()
+
+
+def spotcli(monkeypatch, *argv):
+    monkeypatch.setattr(sys, 'argv', ['spotcli'] + list(argv))
+    cli.init()
+
+
+class Killed(BaseException):
+    """Stands in for the process being killed"""
+
+
+def read_ndjson(path):
+    with open(path) as f1:
+        return [json.loads(line) for line in f1]
+
+
+def test_incremental_runs(workdir, monkeypatch):
+    midnight = datetime.datetime.combine(datetime.date.today(), datetime.time())
+
+    with MockSpotPriceServer(history) as server:
+        options = ['-r', 'eu-west-1', '-f', 'ndjson', '--incremental', '--endpoint-url', server.endpoint_url]
+
+        spotcli(monkeypatch, *options)
+        first, = glob.glob('eu-west-1/*.ndjson')
+        start, end = [
+            datetime.datetime.strptime(x, '%Y-%m-%dT%H:%M:%SZ')
+            for x in os.path.basename(first).split('_')[:2]
+        ]
+        # the window ends at the current time, not at midnight
+        assert start == midnight - datetime.timedelta(days=1) and end > midnight
+        records = read_ndjson(first)
+        assert records
+
+        spotcli(monkeypatch, *options)
+        second, = set(glob.glob('eu-west-1/*.ndjson')) - {first}
+
+    # the second run starts at the latest Timestamp retrieved by the first
+    latest = max(x['Timestamp'] for x in records)
+    assert os.path.basename(second).startswith(latest)
+    seen = {json.dumps(x, sort_keys=True) for x in records}
+    assert not any(json.dumps(x, sort_keys=True) in seen for x in read_ndjson(second))
+
+
+def test_unsupported_codec(workdir, monkeypatch):
+    with pytest.raises(SystemExit):
+        spotcli(monkeypatch, '-r', 'eu-west-1', '-f', 'parquet', '-c', 'xz', '--endpoint-url', 'http://127.0.0.1:9')
+    assert not os.path.exists('eu-west-1')
+
+
+def test_missing_optional_package(workdir, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with MockSpotPriceServer(history) as server:
+        spotcli(monkeypatch, '-r', 'eu-west-1', '-f', 'parquet', '--endpoint-url', server.endpoint_url)
+        assert server.stats['requests'] == 0
+    assert 'pip install spotlib[parquet]' in capsys.readouterr().out
+
+
+def test_request_filters(workdir, monkeypatch):
+    with MockSpotPriceServer(history) as server:
+        spotcli(monkeypatch, '-r', 'us-east-1', 'eu-west-1', '--az', 'eu-west-1b', '-i', 'c5.xlarge',
+                '-f', 'ndjson', '--endpoint-url', server.endpoint_url)
+
+    # no output is written for regions other than that of the availability zone
+    assert not os.path.exists('us-east-1')
+    path, = glob.glob('eu-west-1/*.ndjson')
+    records = read_ndjson(path)
+    assert records and all(
+        (x['InstanceType'], x['AvailabilityZone']) == ('c5.xlarge', 'eu-west-1b') for x in records
+    )
+
+
+
+def test_sqlite_single_database(workdir, monkeypatch):
+    regions = ['us-east-1', 'eu-west-1']
+    with MockSpotPriceServer(history) as server:
+        spotcli(monkeypatch, '-r', *regions, '-f', 'sqlite', '--endpoint-url', server.endpoint_url)
+        spotcli(monkeypatch, '-r', *regions, '-f', 'sqlite', '--database', 'prices.sqlite',
+                '--checkpoint', 'checkpoint.json', '--endpoint-url', server.endpoint_url)
+
+    # every region is added to one database; no file is written per region
+    assert not any(os.path.exists(x) for x in regions)
+    assert not os.path.exists('checkpoint.json')
+    counts = []
+    for path in (cli.default_database, 'prices.sqlite'):
+        with SpotPriceStore(path) as store:
+            zones = store.conn.execute('SELECT DISTINCT availability_zone FROM spot_prices').fetchall()
+            assert {x[:-1] for x, in zones} == set(regions)
+            counts.append(len(store))
+    assert counts[0] == counts[1] > 0
+
+@pytest.mark.parametrize('compress', [None, 'gzip'])
+def test_checkpoint_resume_after_kill(workdir, monkeypatch, compress):
+    spills, handles = [], []
+    write_buffer = NdjsonWriter._write_buffer
+
+    def spill(self):
+        if self.buffer:
+            spills.append(len(self.buffer))
+        write_buffer(self)
+        if len(spills) == 6:
+            # killed once records reach the file but before the checkpoint
+            # records their page; a compressed stream is left unterminated
+            self.handle.flush()
+            handles.append(self.handle)
+            self.closed = True
+            raise Killed()
+
+    options = ['-r', 'eu-west-1', '-f', 'ndjson', '--checkpoint', 'spotprices.checkpoint']
+    options += ['-c', compress] if compress else []
+
+    with MockSpotPriceServer(history, max_results=7) as server:
+        options += ['--endpoint-url', server.endpoint_url]
+        with monkeypatch.context() as m:
+            m.setattr(NdjsonWriter, '_write_buffer', spill)
+            m.setattr(NdjsonWriter.__init__, '__defaults__', (5, None, False, None))
+            with pytest.raises(Killed):
+                spotcli(monkeypatch, *options)
+        spotcli(monkeypatch, *options)
+
+    path, = glob.glob('eu-west-1/*.ndjson*')
+    start, end = [
+        datetime.datetime.strptime(x, '%Y-%m-%dT%H:%M:%SZ') for x in os.path.basename(path).split('_')[:2]
+    ]
+    with open_file(path, 'rt') as handle:
+        lines = handle.read().splitlines()
+    assert len(lines) == len(set(lines)) == len(history.history('eu-west-1', start, end))
+    assert not os.path.exists('spotprices.checkpoint')
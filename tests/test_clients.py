@@ -0,0 +1,33 @@
+import gc
+import boto3
+from spotlib.core import clients
+from spotlib.core.clients import get_client, clear_clients
+
+
+def session():
+    return boto3.session.Session(aws_access_key_id='mock', aws_secret_access_key='mock', region_name='us-east-1')
+
+
+def test_client_reused_per_region():
+    clear_clients()
+    first = session()
+    client = get_client(first, 'ec2', 'us-east-1')
+    assert get_client(first, 'ec2', 'us-east-1') is client
+    assert get_client(first, 'ec2', 'eu-west-1') is not client
+    assert get_client(first, 'ec2', 'us-east-1', max_pool_connections=20) is not client
+    assert get_client(first, 'ec2', 'us-east-1', endpoint_url='http://127.0.0.1:9') is not client
+    assert get_client(first, 'ec2', 'us-east-1', max_attempts=0) is not client
+    clear_clients()
+
+
+def test_clients_keyed_by_session():
+    clear_clients()
+    first, second = session(), session()
+    assert get_client(first, 'ec2', 'us-east-1') is not get_client(second, 'ec2', 'us-east-1')
+    assert len(clients._clients) == 2
+
+    # clients are discarded with their session
+    del second
+    gc.collect()
+    assert list(clients._clients) == [first]
+    clear_clients()
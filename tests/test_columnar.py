@@ -0,0 +1,59 @@
+import datetime
+import pytest
+from spotlib.core.columnar import CategoryTable, SpotPriceColumns, SpotPriceRecord
+
+
+t0 = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def price(zone, instance_type, seconds=0, product='Linux/UNIX'):
+    return {
+        'AvailabilityZone': zone,
+        'InstanceType': instance_type,
+        'ProductDescription': product,
+        'SpotPrice': '0.042000',
+        'Timestamp': t0 + datetime.timedelta(seconds=seconds)
+    }
+
+
+page = [
+    price('us-east-1b', 'm5.large', 3),
+    price('us-east-1a', 'c5.xlarge', 2, 'Windows'),
+    price('us-east-1b', 'm5.large', 1),
+]
+
+
+def test_category_table_update():
+    table = CategoryTable()
+    table.update(page)
+    table.update(iter([price('us-east-1c', 'm5.large')]))
+    # codes in order of first appearance
+    assert table.categories('AvailabilityZone') == ['us-east-1b', 'us-east-1a', 'us-east-1c']
+    assert table.categories('InstanceType') == ['m5.large', 'c5.xlarge']
+    assert table.encode('ProductDescription', 'Windows') == 1
+    assert table.decode('InstanceType', 1) == 'c5.xlarge'
+    assert len(table) == 7
+
+
+def test_category_table_fields():
+    table = CategoryTable(fields=('InstanceType',))
+    table.update(page)
+    assert table.to_dict() == {'InstanceType': ['m5.large', 'c5.xlarge']}
+
+
+def test_spotprice_columns():
+    categories = CategoryTable(fields=('ProductDescription', 'InstanceType', 'AvailabilityZone'))
+    columns = SpotPriceColumns(page, categories=categories)
+    assert len(columns) == 3
+    assert columns[1] == SpotPriceRecord.from_dict(page[1])
+    assert [x['Timestamp'] for x in columns.to_dicts()] == [x['Timestamp'] for x in page]
+    assert columns.distinct('InstanceType') == ['m5.large', 'c5.xlarge']
+
+    # a shared table keeps codes consistent between stores
+    other = SpotPriceColumns([price('us-east-1a', 'c5.xlarge')], categories=categories)
+    assert other.codes('InstanceType')[0] == columns.codes('InstanceType')[1]
+
+
+def test_spotprice_columns_requires_all_fields():
+    with pytest.raises(ValueError):
+        SpotPriceColumns(categories=CategoryTable(fields=('InstanceType',)))
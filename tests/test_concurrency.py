@@ -0,0 +1,61 @@
+import threading
+import itertools
+import collections
+import pytest
+from spotlib.core.concurrency import merge_iterables
+
+
+def pages(index, count):
+    for number in range(count):
+        yield (index, number)
+
+
+def pool_threads():
+    return [x for x in threading.enumerate() if x.name.startswith('ThreadPoolExecutor')]
+
+
+def test_merge_yields_each_item_once():
+    merged = list(merge_iterables([pages(i, 200) for i in range(5)], workers=3, maxsize=4))
+    assert collections.Counter(merged) == collections.Counter(
+        (i, n) for i in range(5) for n in range(200)
+    )
+    # items of one iterable keep their order
+    for index in range(5):
+        assert [n for i, n in merged if i == index] == list(range(200))
+
+
+def test_merge_raises_worker_exception():
+    def failing():
+        yield (9, 0)
+        raise ValueError('page request failed')
+
+    with pytest.raises(ValueError, match='page request failed'):
+        list(merge_iterables([pages(0, 100), failing()], workers=2, maxsize=2))
+    assert not pool_threads()
+
+
+def test_merge_consumer_stops_early():
+    closed = []
+
+    def endless(index):
+        try:
+            for number in itertools.count():
+                yield (index, number)
+        finally:
+            closed.append(index)
+
+    def consume():
+        merged = merge_iterables([endless(i) for i in range(3)], workers=3, maxsize=2)
+        taken = list(itertools.islice(merged, 10))
+        merged.close()
+        result.extend(taken)
+
+    result = []
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    consumer.join(timeout=10)
+
+    assert not consumer.is_alive(), 'merge_iterables deadlocked after the consumer stopped'
+    assert len(result) == 10
+    assert sorted(closed) == [0, 1, 2]
+    assert not pool_threads()
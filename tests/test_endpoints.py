@@ -0,0 +1,36 @@
+import datetime
+from spotlib.core.endpoints import shard_windows, parse_datetime, DurationEndpoints
+
+
+start = datetime.datetime(2019, 9, 1)
+end = datetime.datetime(2019, 10, 1)
+
+
+def test_shard_windows_contiguous():
+    windows = shard_windows(start, end, 4)
+    assert len(windows) == 4
+    assert windows[0][0] == start
+    assert windows[-1][1] == end
+    for (s1, e1), (s2, e2) in zip(windows, windows[1:]):
+        assert e1 == s2
+
+
+def test_shard_windows_single():
+    assert shard_windows(start, end, 1) == [(start, end)]
+    assert shard_windows(start, end, 0) == [(start, end)]
+
+
+def test_parse_datetime():
+    utc = datetime.timezone.utc
+    expected = datetime.datetime(2019, 9, 3, 8, tzinfo=utc)
+    for dt_str in ['2019-09-03T08:00:00', '2019-09-03 08:00:00', '2019-09-03T08:00:00Z',
+                   '2019-09-03T10:00:00+02:00', '2019-09-03T10:00:00+0200', '2019-09-03T08:00']:
+        assert parse_datetime(dt_str) == expected
+    assert parse_datetime('2019-09-03') == datetime.datetime(2019, 9, 3, tzinfo=utc)
+    assert parse_datetime('2019-09-03T08:00:00.123456789Z').microsecond == 123456
+
+
+def test_duration_endpoints_strings():
+    d = DurationEndpoints(start_dt='2019-09-03T00:00:00Z', end_dt='2019-09-04')
+    assert d.start == datetime.datetime(2019, 9, 3, tzinfo=datetime.timezone.utc)
+    assert d.end == datetime.datetime(2019, 9, 4, tzinfo=datetime.timezone.utc)
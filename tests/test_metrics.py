@@ -0,0 +1,65 @@
+import json
+import datetime
+import boto3
+from spotlib.core import EC2SpotPrices
+from spotlib.core.metrics import Metrics, metrics
+from spotlib.core.utc import format_timestamps
+from spotlib.mock import MockSpotPriceServer, SyntheticHistory
+
+
+def test_disabled_metrics_record_nothing():
+    registry = Metrics()
+    with registry.timer('fetch', 'us-east-1'):
+        pass
+    registry.count('pages', 1, 'us-east-1')
+    assert registry.summary() == {'stages': {}, 'counters': {}}
+
+
+def test_metrics_export(tmpdir):
+    registry = Metrics(enabled=True)
+    with registry.timer('fetch', 'us-east-1'):
+        pass
+    registry.observe('auth', 0.25)
+    registry.count('records', 10, 'us-east-1')
+    registry.count('records', 5, 'eu-west-1')
+
+    summary = registry.summary()
+    assert list(summary['stages']) == ['auth', 'fetch']
+    assert summary['stages']['fetch']['regions']['us-east-1']['calls'] == 1
+    assert summary['counters']['records'] == {'eu-west-1': 5, 'us-east-1': 10}
+
+    text = registry.prometheus()
+    assert 'spotlib_stage_seconds_total{stage="auth"} 0.25' in text
+    assert 'spotlib_records_total{region="us-east-1"} 10' in text
+
+    assert json.load(open(registry.save(str(tmpdir.join('stats.json'))))) == summary
+    assert open(registry.save(str(tmpdir.join('stats.prom')))).read() == text
+
+
+def test_pipeline_metrics():
+    history = SyntheticHistory(instance_types=['m5.large'], product_descriptions=['Linux/UNIX'])
+    metrics.reset()
+    metrics.enable()
+    try:
+        with MockSpotPriceServer(history, max_results=4, throttle=0.2, seed=3) as server:
+            sp = EC2SpotPrices(start_dt=datetime.datetime(2020, 1, 1), end_dt=datetime.datetime(2020, 1, 3),
+                               page_size=4, endpoint_url=server.endpoint_url, verify_credentials=False,
+                               rate_limit=None, max_retries=20)
+            sp.session = boto3.session.Session(
+                aws_access_key_id='mock', aws_secret_access_key='mock', region_name='us-east-1'
+            )
+            sp.regions = ['us-east-1']
+            prices = format_timestamps(list(sp._spotprice_generator('us-east-1')))
+
+        counters = metrics.summary()['counters']
+        assert counters['records']['us-east-1'] == len(prices)
+        assert counters['pages']['us-east-1'] == server.stats['pages']
+        # every throttled request is retried by spotlib; botocore retries are disabled
+        assert server.stats['throttled'] > 0
+        assert counters['throttles']['us-east-1'] == server.stats['throttled']
+        assert counters['retries']['us-east-1'] == server.stats['throttled']
+        assert counters['bytes']['us-east-1'] > 0
+        assert set(metrics.summary()['stages']) == {'fetch', 'convert'}
+    finally:
+        metrics.enable(False)
+        metrics.reset()
@@ -0,0 +1,255 @@
+import gc
+import weakref
+import datetime
+import threading
+import boto3
+import pytest
+from spotlib.core import EC2SpotPrices
+from spotlib.core.checkpoint import Checkpoint
+from spotlib.core.ratelimit import TokenBucket, clear_buckets
+from spotlib.mock import MockSpotPriceServer, SyntheticHistory
+
+
+start = datetime.datetime(2020, 1, 1)
+end = datetime.datetime(2020, 1, 3)
+history = SyntheticHistory(instance_types=['m5.large', 'c5.xlarge'], product_descriptions=['Linux/UNIX'])
+
+
+def spotprices(server, **kwargs):
+    kwargs.setdefault('start_dt', start)
+    kwargs.setdefault('end_dt', end)
+    sp = EC2SpotPrices(endpoint_url=server.endpoint_url, verify_credentials=False, **kwargs)
+    sp.session = boto3.session.Session(
+        aws_access_key_id='mock', aws_secret_access_key='mock', region_name='us-east-1'
+    )
+    return sp
+
+
+def test_synthetic_history_deterministic():
+    prices = history.history('eu-west-1', start, end)
+    assert prices == SyntheticHistory(
+        instance_types=['m5.large', 'c5.xlarge'], product_descriptions=['Linux/UNIX']
+    ).history('eu-west-1', start, end)
+    assert len({(x['AvailabilityZone'], x['InstanceType']) for x in prices}) == 6
+    assert all(a['Timestamp'] >= b['Timestamp'] for a, b in zip(prices, prices[1:]))
+
+
+def test_mock_server_pagination():
+    with MockSpotPriceServer(history, max_results=7) as server:
+        sp = spotprices(server, page_size=5)
+        sp.regions = ['eu-west-1']
+        prices = list(sp._spotprice_generator('eu-west-1'))
+        assert len(prices) == len(history.history('eu-west-1', start, end))
+        assert server.stats['pages'] > 1
+
+
+def test_mock_server_throttling_retried():
+    with MockSpotPriceServer(history, max_results=5, throttle=0.3, seed=1) as server:
+        sp = spotprices(server, page_size=5, max_retries=20, rate_limit=None)
+        sp.regions = ['us-east-1']
+        prices = list(sp._spotprice_generator('us-east-1'))
+        assert len(prices) == len(history.history('us-east-1', start, end))
+        assert server.stats['throttled'] > 0
+
+
+def test_token_per_request(monkeypatch):
+    acquired = []
+    monkeypatch.setattr(TokenBucket, 'acquire', lambda self, *args: acquired.append(1))
+    clear_buckets()
+    with MockSpotPriceServer(history, max_results=5, throttle=0.3, seed=1) as server:
+        sp = spotprices(server, page_size=5, max_retries=20, rate_limit=1000)
+        sp.regions = ['us-east-1']
+        assert sp._client('us-east-1').meta.config.retries['total_max_attempts'] == 1
+        list(sp._spotprice_generator('us-east-1'))
+        # botocore does not retry behind the rate limiter
+        assert server.stats['throttled'] > 0 and len(acquired) == server.stats['requests']
+    clear_buckets()
+
+
+def test_mock_server_regions():
+    with MockSpotPriceServer(history, regions=['us-east-1', 'eu-west-1']) as server:
+        assert spotprices(server).regions == ['us-east-1', 'eu-west-1']
+
+
+def test_checkpoint_after_flush(tmpdir):
+    path = str(tmpdir.join('spotprices.checkpoint'))
+    written, flushed = [], []
+
+    def flush():
+        flushed.extend(written)
+        written.clear()
+
+    with MockSpotPriceServer(history, max_results=7) as server:
+        sp = spotprices(server, checkpoint=path)
+        for page in sp.stream_pricedata(['eu-west-1'], pages=True, flush=flush):
+            # pages are recorded in the checkpoint only once flushed by the consumer
+            assert sum(x['count'] for x in Checkpoint(path).state['windows'].values()) == len(flushed)
+            written.extend(page)
+
+    assert not written and len(flushed) == len(history.history('eu-west-1', start, end))
+
+
+def test_request_filters(monkeypatch):
+    requests = []
+    products = SyntheticHistory(instance_types=['m5.large', 'c5.xlarge'],
+                                product_descriptions=['Linux/UNIX', 'Windows'])
+
+    with MockSpotPriceServer(products) as server:
+        respond = server.respond
+        monkeypatch.setattr(server, 'respond', lambda region, params: requests.append((region, params)) or
+                            respond(region, params))
+        sp = spotprices(server, instance_types=['c5.xlarge'], product_descriptions=['Windows'],
+                        availability_zone='eu-west-1b')
+        prices = list(sp.stream_pricedata(['us-east-1', 'eu-west-1']))
+
+    # regions other than that of the availability zone are not requested
+    assert {region for region, params in requests} == {'eu-west-1'}
+    for region, params in requests:
+        assert params['InstanceType.1'] == 'c5.xlarge'
+        assert params['ProductDescription.1'] == 'Windows'
+        assert params['AvailabilityZone'] == 'eu-west-1b'
+    assert prices and all(
+        (x['InstanceType'], x['ProductDescription'], x['AvailabilityZone']) ==
+        ('c5.xlarge', 'Windows', 'eu-west-1b') for x in prices
+    )
+
+
+def test_stream_pricedata_pages():
+    with MockSpotPriceServer(history, max_results=7) as server:
+        sp = spotprices(server)
+        pages = list(sp.stream_pricedata(['eu-west-1'], pages=True, dtstrings=True))
+        assert len(pages) == server.stats['pages'] > 1
+        prices = list(sp.stream_pricedata(['eu-west-1']))
+
+    assert all(isinstance(x, list) and 0 < len(x) <= 7 for x in pages)
+    assert all(isinstance(x['Timestamp'], datetime.datetime) for x in prices)
+    assert [x for page in pages for x in page] == [
+        dict(x, Timestamp=x['Timestamp'].strftime('%Y-%m-%dT%H:%M:%SZ')) for x in prices
+    ]
+
+
+def test_synthetic_history_releases_instances():
+    instance = SyntheticHistory(instance_types=['m5.large'], product_descriptions=['Linux/UNIX'])
+    instance.history('eu-west-1', start, end)
+    reference = weakref.ref(instance)
+    del instance
+    gc.collect()
+    # the day cache is held by the instance, not by a class level lru_cache
+    assert reference() is None
+
+
+def test_shards_match_single_window():
+    def records(shards, lo, hi):
+        sp = spotprices(server, start_dt=lo, end_dt=hi, shards=shards)
+        return [
+            (x['AvailabilityZone'], x['InstanceType'], x['ProductDescription'], x['SpotPrice'], x['Timestamp'])
+            for x in sp.stream_pricedata(['eu-west-1'])
+        ]
+
+    # a shard boundary falls on the Timestamp of a price change
+    boundary = history.history('eu-west-1', start, end)[40]['Timestamp'].replace(tzinfo=None)
+    windows = [
+        (boundary - datetime.timedelta(days=1), boundary + datetime.timedelta(days=1), [2, 4]),
+        (start, end + datetime.timedelta(seconds=1), [3, 7])    # shards do not divide the window
+    ]
+    with MockSpotPriceServer(history, max_results=50) as server:
+        for lo, hi, counts in windows:
+            expected = records(1, lo, hi)
+            assert len(expected) == len(set(expected))
+            for shards in counts:
+                sharded = records(shards, lo, hi)
+                # no record is dropped or kept by two shards at their boundaries
+                assert len(sharded) == len(set(sharded))
+                assert sorted(sharded) == sorted(expected)
+
+
+def test_concurrent_regions():
+    regions = ['us-east-1', 'eu-west-1', 'ap-south-1']
+
+    def by_region(prices):
+        return {
+            region: sorted(tuple(sorted(x.items())) for x in prices if x['AvailabilityZone'].startswith(region))
+            for region in regions
+        }
+
+    with MockSpotPriceServer(history, max_results=5) as server:
+        sequential = spotprices(server, workers=1).generate_pricedata(regions)['SpotPriceHistory']
+        sp = spotprices(server, workers=3, shards=2)
+        concurrent = sp.generate_pricedata(regions)['SpotPriceHistory']
+
+    assert all(by_region(sequential).values())
+    assert by_region(concurrent) == by_region(sequential)
+    # paginators are local to the worker using them
+    assert not [x for x in ('client', 'paginator', 'page_iterator') if hasattr(sp, x)]
+
+
+def test_concurrent_region_failure(monkeypatch):
+    closed = []
+    region_stream = EC2SpotPrices._region_stream
+
+    def failing():
+        yield []
+        raise RuntimeError('region worker failed')
+
+    def tracked(region, stream):
+        try:
+            yield from stream
+        finally:
+            closed.append(region)
+
+    def stream(self, region, params):
+        if region == 'ap-south-1':
+            return failing()
+        return tracked(region, region_stream(self, region, params))
+
+    monkeypatch.setattr(EC2SpotPrices, '_region_stream', stream)
+    with MockSpotPriceServer(history, max_results=2, latency=0.02) as server:
+        sp = spotprices(server, workers=3)
+        with pytest.raises(RuntimeError, match='region worker failed'):
+            sp.generate_pricedata(['us-east-1', 'eu-west-1', 'ap-south-1'])
+        pages = server.stats['pages']
+
+    # the other regions are abandoned rather than retrieved to the end
+    assert sorted(closed) == ['eu-west-1', 'us-east-1']
+    full = 2 * -(-len(history.history('us-east-1', start, end)) // 2)
+    assert pages < full
+    assert not [x for x in threading.enumerate() if x.name.startswith('ThreadPoolExecutor')]
+
+
+def test_generate_recordbatches():
+    pa = pytest.importorskip('pyarrow')
+    from spotlib.core.columnar import arrow_schema
+
+    with MockSpotPriceServer(history, max_results=5) as server:
+        sp = spotprices(server)
+        batches = list(sp.generate_recordbatches(['us-east-1', 'eu-west-1'], batch_size=7))
+        prices = sp.generate_pricedata(['us-east-1', 'eu-west-1'])['SpotPriceHistory']
+
+    assert all(x.schema.equals(arrow_schema()) for x in batches)
+    # pages of 5 are re-cut into full batches of 7, the remainder in the last
+    assert [x.num_rows for x in batches[:-1]] == [7] * (len(batches) - 1)
+    assert 0 < batches[-1].num_rows <= 7
+    assert sum(x.num_rows for x in batches) == len(prices)
+
+    table = pa.Table.from_batches(batches).to_pylist()
+    assert sorted((x['AvailabilityZone'], x['InstanceType'], x['Timestamp'], x['SpotPrice']) for x in table) == \
+        sorted((x['AvailabilityZone'], x['InstanceType'], x['Timestamp'], float(x['SpotPrice'])) for x in prices)
+
+
+def test_compact_matches_dicts():
+    regions = ['us-east-1', 'eu-west-1']
+
+    with MockSpotPriceServer(history, max_results=5) as server:
+        sp = spotprices(server)
+        prices = sp.generate_pricedata(regions)['SpotPriceHistory']
+        columns = sp.generate_pricedata(regions, compact=True)['SpotPriceHistory']
+        records = list(sp.stream_pricedata(regions, compact=True))
+        strings = sp.generate_pricedata(regions, dtstrings=True)['SpotPriceHistory']
+
+    # compact containers hold SpotPrice as a float
+    expected = [dict(x, SpotPrice=float(x['SpotPrice'])) for x in prices]
+    assert expected
+    assert columns.to_dicts() == expected
+    assert [x.to_dict() for x in records] == expected
+    assert list(columns) == records
+    assert columns.to_dicts(dtstrings=True) == [dict(x, SpotPrice=float(x['SpotPrice'])) for x in strings]
@@ -0,0 +1,31 @@
+import pstats
+from spotlib.profiling import Profiler
+
+
+def allocate(n):
+    return [str(x) * 10 for x in range(n)]
+
+
+def test_profiler_disabled():
+    profiler = Profiler().start()
+    profiler.section('us-east-1', region='us-east-1')
+    assert profiler.stop() == [] and profiler.sections == []
+
+
+def test_profiler_reports(tmpdir):
+    cpu, memory = str(tmpdir.join('run.pstats')), str(tmpdir.join('memory.txt'))
+    profiler = Profiler(cpu=cpu, memory=memory, top=5).start(format='ndjson')
+    for region in ('us-east-1', 'eu-west-1'):
+        profiler.section(region, region=region, start='2020-01-01', end='2020-01-02')
+        kept = allocate(20000)
+    assert profiler.stop() == [cpu, cpu + '.txt', memory]
+
+    assert any(x[2] == 'allocate' for x in pstats.Stats(cpu).stats)
+    report = open(cpu + '.txt').read()
+    assert 'section setup' in report and 'format: ndjson' in report
+    assert 'section eu-west-1 [region: eu-west-1, start: 2020-01-01, end: 2020-01-02]' in report
+
+    report = open(memory).read()
+    assert report.count('peak traced:') == 3
+    assert 'test_profiling.py' in report
+    assert kept
@@ -0,0 +1,32 @@
+import time
+from botocore.exceptions import ClientError
+from spotlib.core.ratelimit import TokenBucket, backoff, retryable, throttled
+
+
+def client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': ''}}, 'DescribeSpotPriceHistory')
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=100, burst=10)
+    start = time.monotonic()
+    for _ in range(30):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_token_bucket_adapts():
+    bucket = TokenBucket(rate=20, min_rate=1)
+    bucket.throttled()
+    assert bucket.rate == 10
+    for _ in range(100):
+        bucket.success()
+    assert bucket.rate == 20
+
+
+def test_retryable():
+    assert throttled(client_error('RequestLimitExceeded'))
+    assert retryable(client_error('RequestLimitExceeded'))
+    assert retryable(client_error('InternalError')) and not throttled(client_error('InternalError'))
+    assert not retryable(client_error('UnauthorizedOperation'))
+    assert all(0 <= backoff(x, base=0.5, cap=4) <= 4 for x in range(10))
@@ -0,0 +1,43 @@
+import json
+import time
+import functools
+import pytest
+from botocore.config import Config
+from spotlib import lambda_utils
+from spotlib.core.ancillary import clear_session_cache
+
+
+@pytest.fixture
+def region_cache(tmpdir, monkeypatch):
+    """Region catalog file in tmpdir, clear in-memory catalog and sessions"""
+    path = str(tmpdir.join('regions.json'))
+    monkeypatch.setattr(lambda_utils, '_read_region_cache',
+                        functools.partial(lambda_utils._read_region_cache, path=path))
+    monkeypatch.setattr(lambda_utils, '_write_region_cache',
+                        functools.partial(lambda_utils._write_region_cache, path=path))
+    monkeypatch.setattr(lambda_utils, '_region_catalog', {})
+    clear_session_cache()
+    yield path
+    clear_session_cache()
+
+
+def test_expired_cache_used_offline(region_cache, monkeypatch):
+    with open(region_cache, 'w') as handle:
+        json.dump({'default': {'timestamp': time.time() - 10 ** 6, 'regions': ['eu-west-1']}}, handle)
+
+    # environment credentials, no network: nothing listens on port 9
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'offline')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'offline')
+    monkeypatch.delenv('AWS_SESSION_TOKEN', raising=False)
+    monkeypatch.setattr(lambda_utils, 'get_client', lambda session, service: session.client(
+        service, region_name='us-east-1', endpoint_url='http://127.0.0.1:9',
+        config=Config(retries={'max_attempts': 0}, connect_timeout=1)))
+
+    assert lambda_utils.get_regions() == ['eu-west-1']
+
+
+def test_region_cache_written(region_cache):
+    lambda_utils._write_region_cache('default', ['us-east-1'])
+    with open(region_cache) as handle:
+        assert json.load(handle)['default']['regions'] == ['us-east-1']
+    assert lambda_utils._read_region_cache('default')['regions'] == ['us-east-1']
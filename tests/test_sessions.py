@@ -0,0 +1,85 @@
+import types
+import threading
+import pytest
+from spotlib.core import ancillary
+from spotlib.core.ancillary import session_selector, clear_session_cache, SESSION_TTL
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Replaces session creation and the clock; returns the (profile, verify) of each session created"""
+    created, clock = [], types.SimpleNamespace(now=1000.0)
+
+    def select(profile, verify=True):
+        created.append((profile, verify))
+        return object()
+
+    monkeypatch.setattr(ancillary, '_select_session', select)
+    monkeypatch.setattr(ancillary, 'time', types.SimpleNamespace(monotonic=lambda: clock.now))
+    clear_session_cache()
+    yield created, clock
+    clear_session_cache()
+
+
+def test_session_reused_within_ttl(sessions):
+    created, clock = sessions
+    session = session_selector('default')
+    clock.now += SESSION_TTL - 1
+    assert session_selector('default') is session
+    assert session_selector('other') is not session
+    assert created == [('default', True), ('other', True)]
+
+
+def test_session_expires(sessions):
+    created, clock = sessions
+    session = session_selector('default')
+    clock.now += SESSION_TTL
+    assert session_selector('default') is not session
+    assert len(created) == 2
+
+
+def test_session_cache_bypassed(sessions):
+    created, clock = sessions
+    # a session created without verification is verified when next requested with it
+    unverified = session_selector('default', verify=False)
+    assert session_selector('default', verify=False) is unverified
+    assert session_selector('default') is not unverified
+    # ttl 0 disables caching
+    assert session_selector('ttl', ttl=0) is not session_selector('ttl', ttl=0)
+    clear_session_cache()
+    session_selector('default')
+    assert len(created) == 5
+
+
+def test_session_lock_per_credential_set(monkeypatch):
+    created, started, release = [], threading.Event(), threading.Event()
+
+    def select(profile, verify=True):
+        created.append(profile)
+        if profile == 'slow':
+            started.set()
+            release.wait(timeout=10)
+        return object()
+
+    monkeypatch.setattr(ancillary, '_select_session', select)
+    clear_session_cache()
+    try:
+        slow = [threading.Thread(target=session_selector, args=('slow',)) for _ in range(3)]
+        for thread in slow:
+            thread.start()
+        assert started.wait(timeout=10)
+
+        # sessions of other credentials are created while the sts call of 'slow' is pending
+        fast = threading.Thread(target=session_selector, args=('fast',))
+        fast.start()
+        fast.join(timeout=2)
+        assert not fast.is_alive() and 'fast' in created
+
+        release.set()
+        for thread in slow:
+            thread.join(timeout=10)
+        # concurrent callers with the same credentials share one session
+        assert created.count('slow') == 1
+    finally:
+        release.set()
+        clear_session_cache()
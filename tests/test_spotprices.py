@@ -58,3 +58,51 @@ def test_spotprice_pull():
 
         failure = f'Problem writing data to s3 bucket {bucket} of object {key}'
         logger.warning(failure)
+
+
+def test_spotprices_lazy(monkeypatch):
+    from spotlib.core import spotcore
+    calls = []
+    session = boto3.session.Session(aws_access_key_id='mock', aws_secret_access_key='mock', region_name='us-east-1')
+    monkeypatch.setattr(spotcore, 'session_selector', lambda *args, **kwargs: calls.append('session') or session)
+    monkeypatch.setattr(spotcore, 'get_regions', lambda *args, **kwargs: calls.append('regions') or ['us-east-1'])
+
+    sp = EC2SpotPrices(profile='default')
+    # construction neither authenticates nor lists regions
+    assert calls == []
+    assert sp.session is session and sp.session is session
+    assert sp.regions == ['us-east-1'] and sp.regions == ['us-east-1']
+    assert calls == ['session', 'regions']
+
+
+def test_spotprices_warmup(monkeypatch):
+    from spotlib.core import spotcore
+    created = []
+    monkeypatch.setattr(spotcore, 'get_client', lambda session, service, region, *args: created.append(region))
+
+    sp = EC2SpotPrices(profile='default')
+    sp.session = boto3.session.Session(aws_access_key_id='mock', aws_secret_access_key='mock')
+    sp.regions = ['us-east-1', 'eu-west-1']
+    assert sp.warmup() is sp
+    assert created == ['us-east-1', 'eu-west-1']
+    sp.warmup(['ap-south-1'])
+    assert created[-1] == 'ap-south-1'
+
+
+def test_incremental_endpoints_aware(tmp_path):
+    sp = EC2SpotPrices(incremental=True, watermarks=str(tmp_path / 'watermarks.json'))
+    assert sp.end.tzinfo is not None and sp.start.tzinfo is not None
+    start, end = sp.set_endpoints(datetime.datetime(2020, 1, 1), None)
+    assert start == datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    assert end.tzinfo is not None and start < end
+    start, end = sp.set_endpoints(duration=2)
+    assert end - start == datetime.timedelta(days=2)
+
+
+def test_request_filters_override():
+    sp = EC2SpotPrices(instance_types=['m5.large'], availability_zone='eu-west-1a')
+    assert sp._request_filters() == {'InstanceTypes': ['m5.large'], 'AvailabilityZone': 'eu-west-1a'}
+    # empty values clear the filters set on the instance
+    assert sp._request_filters(instance_types=[], availability_zone='') == {}
+    assert sp.filter_regions(['us-east-1', 'eu-west-1']) == ['eu-west-1']
+    assert sp.filter_regions(['us-east-1', 'eu-west-1'], params={}) == ['us-east-1', 'eu-west-1']
@@ -0,0 +1,47 @@
+import os
+import datetime
+from spotlib.store import SpotPriceStore
+
+
+def price(zone, instance_type, price, ts):
+    return {
+        'AvailabilityZone': zone,
+        'InstanceType': instance_type,
+        'ProductDescription': 'Linux/UNIX',
+        'SpotPrice': price,
+        'Timestamp': ts
+    }
+
+
+records = [
+    price('us-east-1a', 'm5.large', '0.035400', '2019-09-03T00:00:00Z'),
+    price('us-east-1a', 'm5.large', '0.036100', '2019-09-03T06:00:00Z'),
+    price('us-east-1b', 'm5.large', '0.034900', '2019-09-03T03:00:00Z'),
+    price('us-east-1a', 'c5.xlarge', '0.071200', '2019-09-03T01:00:00Z'),
+]
+
+
+def test_store_ingest_unique(tmpdir):
+    filename = os.path.join(str(tmpdir), 'prices.sqlite')
+    with SpotPriceStore(filename, batch_size=2) as store:
+        assert store.ingest(records) == 4
+        assert store.ingest(records) == 0
+        assert len(store) == 4
+
+
+def test_store_history(tmpdir):
+    filename = os.path.join(str(tmpdir), 'prices.sqlite')
+    with SpotPriceStore(filename) as store:
+        store.ingest(records)
+
+    with SpotPriceStore(filename) as store:
+        history = store.history('m5.large', dtstrings=True)
+        assert [x['Timestamp'] for x in history] == [
+            '2019-09-03T00:00:00Z', '2019-09-03T03:00:00Z', '2019-09-03T06:00:00Z'
+        ]
+        history = store.history(
+            'm5.large', 'us-east-1a',
+            start=datetime.datetime(2019, 9, 3, 1, tzinfo=datetime.timezone.utc),
+            end='2019-09-03T23:59:59Z'
+        )
+        assert len(history) == 1 and history[0]['SpotPrice'] == 0.0361
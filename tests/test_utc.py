@@ -0,0 +1,45 @@
+import datetime
+from spotlib.core.utc import (
+    UtcConversion, format_timestamps, utc_conversion, utc_string, utc_cache_info, utc_cache_clear
+)
+
+
+start = datetime.datetime(2019, 8, 11, 23, 56, 50, tzinfo=datetime.timezone.utc)
+timestamps = [start + datetime.timedelta(seconds=997 * x) for x in range(500)]
+
+
+def test_utc_string():
+    assert all(utc_string(x) == x.strftime('%Y-%m-%dT%H:%M:%SZ') for x in timestamps)
+
+
+def test_format_timestamps():
+    page = [{'Timestamp': x} for x in timestamps] + [{'Timestamp': '2019-08-11T23:56:50Z'}]
+    assert format_timestamps(page) is page
+    assert [x['Timestamp'] for x in page] == [
+        x.strftime('%Y-%m-%dT%H:%M:%SZ') for x in timestamps] + ['2019-08-11T23:56:50Z']
+
+
+def test_utc_conversion():
+    assert utc_conversion({'Timestamp': start})['Timestamp'] == '2019-08-11T23:56:50Z'
+    uc = UtcConversion({'SpotPriceHistory': [{'Timestamp': start}]})
+    assert uc.prices == [{'Timestamp': '2019-08-11T23:56:50Z'}]
+    assert uc.formatted == ['2019-08-11T23:56:50Z']
+
+
+def test_utc_cache_info():
+    utc_cache_clear()
+    format_timestamps([{'Timestamp': start} for _ in range(10)])
+    info = utc_cache_info()
+    assert (info['hits'], info['misses'], info['currsize']) == (9, 1, 1)
+    assert info['hit_rate'] == 0.9
+
+
+def test_utc_memo_time_zones():
+    utc_cache_clear()
+    # an equal instant in another time zone shares the memo entry of start
+    local = start.astimezone(datetime.timezone(datetime.timedelta(hours=2)))
+    page = [{'Timestamp': start}, {'Timestamp': local}, {'Timestamp': local}]
+    assert [x['Timestamp'] for x in format_timestamps(page)] == ['2019-08-11T23:56:50Z'] * 3
+
+    utc_cache_clear()
+    assert utc_conversion({'Timestamp': local})['Timestamp'] == '2019-08-11T23:56:50Z'
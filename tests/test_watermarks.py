@@ -0,0 +1,39 @@
+import os
+import datetime
+from spotlib.core.watermarks import Watermark, WatermarkStore
+
+
+t0 = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def price(zone, ts):
+    return {
+        'AvailabilityZone': zone,
+        'InstanceType': 'm5.large',
+        'ProductDescription': 'Linux/UNIX',
+        'SpotPrice': '0.035400',
+        'Timestamp': ts
+    }
+
+
+def test_watermark_is_new():
+    wm = Watermark(t0)
+    wm.advance(price('us-east-1a', t0))
+    assert not wm.is_new(price('us-east-1a', t0))
+    assert wm.is_new(price('us-east-1b', t0))
+    assert not wm.is_new(price('us-east-1b', t0 - datetime.timedelta(seconds=1)))
+    wm.advance(price('us-east-1b', t0 + datetime.timedelta(seconds=1)))
+    assert wm.keys == {('us-east-1b', 'm5.large', 'Linux/UNIX')}
+
+
+def test_watermark_store(tmpdir):
+    path = os.path.join(str(tmpdir), 'watermarks.json')
+    params = {'InstanceTypes': ['m5.large']}
+    store = WatermarkStore(path)
+    assert store.get('us-east-1', params) is None
+    store.update('us-east-1', params, Watermark(t0, [('us-east-1a', 'm5.large', 'Linux/UNIX')]))
+
+    wm = WatermarkStore(path).get('us-east-1', params)
+    assert wm.timestamp == t0
+    assert not wm.is_new(price('us-east-1a', t0))
+    assert WatermarkStore(path).get('us-east-1', {}) is None
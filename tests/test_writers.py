@@ -0,0 +1,105 @@
+import os
+import json
+import pytest
+from spotlib.common import import_file_object, open_file, compression_codec
+from spotlib.writers import StreamWriter, JsonWriter, NdjsonWriter, ParquetWriter, writers
+
+
+records = [
+    {
+        'AvailabilityZone': 'eu-west-1a',
+        'InstanceType': 'm5d.4xlarge',
+        'ProductDescription': 'Red Hat Enterprise Linux',
+        'SpotPrice': '0.420000',
+        'Timestamp': '2019-08-11T23:56:50Z'
+    },
+    {
+        'AvailabilityZone': 'eu-west-1b',
+        'InstanceType': 'm5.large',
+        'ProductDescription': 'Linux/UNIX',
+        'SpotPrice': '0.035400',
+        'Timestamp': '2019-08-11T23:58:01Z'
+    }
+]
+
+
+@pytest.mark.parametrize('compress', [None, 'gzip', 'xz'])
+def test_json_writer(tmpdir, compress):
+    filename = os.path.join(str(tmpdir), 'prices.json')
+    with JsonWriter(filename, compress=compress) as writer:
+        writer.write_many(records)
+    assert compression_codec(filename) == compress
+    assert import_file_object(filename) == {'SpotPriceHistory': records}
+
+
+def test_json_writer_empty(tmpdir):
+    filename = os.path.join(str(tmpdir), 'prices.json')
+    JsonWriter(filename).close()
+    assert import_file_object(filename) == {'SpotPriceHistory': []}
+
+
+@pytest.mark.parametrize('compress', [None, 'gzip', 'xz'])
+def test_ndjson_writer(tmpdir, compress):
+    filename = os.path.join(str(tmpdir), 'prices.ndjson')
+    with NdjsonWriter(filename, buffer_size=1, compress=compress) as writer:
+        writer.write_many(records)
+    with open_file(filename, 'rt') as handle:
+        assert [json.loads(x) for x in handle] == records
+
+
+@pytest.mark.parametrize('compress', [None, 'gzip', 'xz'])
+def test_ndjson_writer_flush(tmpdir, compress):
+    filename = os.path.join(str(tmpdir), 'prices.ndjson')
+    writer = NdjsonWriter(filename, compress=compress)
+    writer.write_many(records[:1])
+    writer.flush()
+    # records flushed are readable while the writer remains open
+    with open_file(filename, 'rt') as handle:
+        assert [json.loads(x) for x in handle] == records[:1]
+    writer.write_many(records[1:])
+    writer.close()
+    with open_file(filename, 'rt') as handle:
+        assert [json.loads(x) for x in handle] == records
+
+
+@pytest.mark.parametrize('compress', [None, 'gzip', 'zstd'])
+def test_parquet_writer(tmpdir, compress):
+    pq = pytest.importorskip('pyarrow.parquet')
+    filename = os.path.join(str(tmpdir), 'prices.parquet')
+    with ParquetWriter(filename, row_group_size=1, compress=compress) as writer:
+        writer.write_many(records)
+    table = pq.read_table(filename)
+    assert table.num_rows == len(records)
+    assert table.column('InstanceType').to_pylist() == [x['InstanceType'] for x in records]
+    assert table.column('SpotPrice').to_pylist() == [float(x['SpotPrice']) for x in records]
+    assert [x.strftime('%Y-%m-%dT%H:%M:%SZ') for x in table.column('Timestamp').to_pylist()] == \
+        [x['Timestamp'] for x in records]
+
+
+def test_parquet_writer_codecs(tmpdir):
+    with pytest.raises(ValueError):
+        ParquetWriter(os.path.join(str(tmpdir), 'prices.parquet'), compress='xz')
+
+
+@pytest.mark.parametrize('writer', sorted(writers))
+def test_writer_codecs(writer):
+    assert None in writers[writer].codecs
+    assert ('xz' in writers[writer].codecs) == (writer in ('json', 'ndjson'))
+
+
+def test_writer_flush_default():
+    class ListWriter(StreamWriter):
+        def __init__(self):
+            self.records = []
+
+        def write(self, price_dict):
+            self.records.append(price_dict)
+
+        def close(self):
+            pass
+
+    # writers without a buffer need not implement flush
+    with ListWriter() as writer:
+        writer.write(records[0])
+        assert writer.flush() is None
+    assert writer.records == records[:1]